@@ -0,0 +1,285 @@
+# intent_bench.py
+"""
+Intent-matching benchmark.
+
+Generates synthetic command catalogs (10 .. 100k commands) and noisy
+utterance corpora (ASR-style typos, dropped/swapped words, filler words and
+out-of-catalog misses), then times every IntentMatcher stage for both the
+rapidfuzz and difflib backends and, in a separate tracemalloc pass, records
+each stage's peak memory. Results are written as JSON so runs can be
+compared over time.
+
+Runs offline and only needs BRAIN.matcher (no TTS/Vosk models):
+    cd Backend
+    python -m BENCHMARK.intent_bench --sizes 10 1000 100000 --out bench_intent.json
+"""
+import gc
+import sys
+import json
+import time
+import random
+import string
+import argparse
+import platform
+import tracemalloc
+from BRAIN import matcher as matcher_mod
+from BRAIN.matcher import IntentMatcher
+
+VERBS = ["open", "launch", "start", "close", "stop", "play", "pause", "show", "turn on", "turn off",
+         "increase", "decrease", "mute", "check", "find", "search", "take", "set", "read", "tell me"]
+OBJECTS = ["chrome", "notepad", "calculator", "music", "volume", "screen", "battery", "weather",
+           "news", "email", "calendar", "alarm", "timer", "wifi", "bluetooth", "camera", "files",
+           "terminal", "editor", "playlist", "brightness", "ip address", "internet speed", "time"]
+FILLERS = ["um", "uh", "please", "jarvis", "hey jarvis", "can you", "could you", "now", "for me", "the"]
+HOMOPHONES = {"two": "to", "for": "four", "right": "write", "new": "knew", "see": "sea", "mail": "male"}
+
+STAGES = ("substring", "token", "fuzzy", "match", "rank")
+
+
+# -----------------------------
+# Synthetic data
+# -----------------------------
+def _pseudo_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+
+
+def make_catalog(size: int, seed: int = 0) -> dict:
+    """size commands with 3-6 keyword phrases each, shaped like commands.json entries."""
+    rng = random.Random(seed)
+    catalog = {}
+    for i in range(size):
+        # beyond the fixed vocabulary, give each command its own object word so keywords stay distinct
+        obj = OBJECTS[i] if i < len(OBJECTS) else f"{rng.choice(OBJECTS)} {_pseudo_word(rng)}"
+        verbs = rng.sample(VERBS, rng.randint(3, 6))
+        keywords = [f"{verb} {obj}" for verb in verbs]
+        catalog[f"cmd_{i}"] = {
+            "keywords": keywords,
+            "response": f"Doing {obj}.",
+            "action": f"action_{i}",
+        }
+    return catalog
+
+
+def _typo(word, rng):
+    if len(word) < 3:
+        return word
+    i = rng.randrange(len(word))
+    op = rng.random()
+    if op < 0.4:    # substitution
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    if op < 0.7:    # deletion
+        return word[:i] + word[i + 1:]
+    return word[:i] + word[i] + word[i:]  # doubled letter
+
+
+def make_utterances(catalog: dict, count: int, seed: int = 1, miss_rate: float = 0.15,
+                    noise_rate: float = 0.3, filler_rate: float = 0.3):
+    """[(utterance, expected_command_key_or_None)] drawn from the catalog keywords."""
+    rng = random.Random(seed)
+    keys = list(catalog.keys())
+    corpus = []
+    for _ in range(count):
+        if rng.random() < miss_rate:
+            words = [_pseudo_word(rng) for _ in range(rng.randint(1, 4))]
+            corpus.append((" ".join(words), None))
+            continue
+        key = rng.choice(keys)
+        words = rng.choice(catalog[key]["keywords"]).split()
+        noisy = []
+        for w in words:
+            r = rng.random()
+            if r < noise_rate * 0.6:
+                noisy.append(_typo(w, rng))
+            elif r < noise_rate * 0.8:
+                noisy.append(HOMOPHONES.get(w, w))
+            elif r < noise_rate and len(words) > 2:
+                continue  # dropped word
+            else:
+                noisy.append(w)
+        if rng.random() < filler_rate:
+            noisy.insert(0, rng.choice(FILLERS))
+        if rng.random() < filler_rate / 2:
+            noisy.append(rng.choice(FILLERS))
+        corpus.append((" ".join(noisy), key))
+    return corpus
+
+
+# -----------------------------
+# Measurement
+# -----------------------------
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def _time_stage(fn, inputs):
+    samples = []
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        for item in inputs:
+            t0 = time.perf_counter_ns()
+            fn(item)
+            samples.append(time.perf_counter_ns() - t0)
+        total = time.perf_counter_ns() - start
+    finally:
+        gc.enable()
+    samples.sort()
+    return {
+        "count": len(samples),
+        "p50_us": round(_percentile(samples, 50) / 1000.0, 2),
+        "p99_us": round(_percentile(samples, 99) / 1000.0, 2),
+        "mean_us": round(sum(samples) / max(len(samples), 1) / 1000.0, 2),
+        "throughput_per_s": round(len(samples) / (total / 1e9), 1) if total else 0.0,
+    }
+
+
+def _stage_memory(fn, inputs):
+    """Peak traced bytes of a stage, over the whole pass and for the largest single call (separate from timing)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        pass_peak = call_peak = 0
+        for item in inputs:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            fn(item)
+            peak = tracemalloc.get_traced_memory()[1]
+            pass_peak = max(pass_peak, peak - base)
+            call_peak = max(call_peak, peak - before)
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": pass_peak, "call_peak_bytes": call_peak}
+
+
+def bench_size(size: int, utterances: int, backend: str, fuzzy_limit: int, seed: int = 0,
+               measure_memory: bool = True):
+    catalog = make_catalog(size, seed=seed)
+    corpus = make_utterances(catalog, utterances, seed=seed + 1)
+    texts = [matcher_mod.normalize(u) for u, _ in corpus]
+
+    use_rapidfuzz = backend == "rapidfuzz"
+    gc.collect()
+    t0 = time.perf_counter()
+    m = IntentMatcher(catalog, use_rapidfuzz=use_rapidfuzz)
+    build_s = time.perf_counter() - t0
+
+    # memory is measured on a second build; tracemalloc would skew the build timing
+    matcher_bytes = build_peak = None
+    if measure_memory:
+        gc.collect()
+        tracemalloc.start()
+        IntentMatcher(catalog, use_rapidfuzz=use_rapidfuzz)
+        matcher_bytes, build_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    result = {
+        "catalog_size": size,
+        "phrases": len(m.phrase_list),
+        "backend": backend,
+        "build_ms": round(build_s * 1000.0, 2),
+        "matcher_bytes": matcher_bytes,
+        "build_peak_bytes": build_peak,
+        "stages": {},
+    }
+
+    run_fuzzy = size <= fuzzy_limit
+    stage_fns = {
+        "substring": m.substring_hit,
+        "token": lambda t: m.token_hit(set(t.split())),
+        "fuzzy": m.fuzzy_hit,
+        "match": m.match,
+        "rank": m.rank,
+    }
+    for stage in STAGES:
+        if stage != "substring" and stage != "token" and not run_fuzzy:
+            result["stages"][stage] = {"skipped": f"catalog larger than fuzzy limit {fuzzy_limit}"}
+            continue
+        result["stages"][stage] = _time_stage(stage_fns[stage], texts)
+        if measure_memory:
+            result["stages"][stage].update(_stage_memory(stage_fns[stage], texts))
+
+    if run_fuzzy:
+        t0 = time.perf_counter()
+        m.fuzzy_matrix(texts)
+        batch_s = time.perf_counter() - t0
+        result["stages"]["fuzzy_batch"] = {
+            "count": len(texts),
+            "total_ms": round(batch_s * 1000.0, 2),
+            "throughput_per_s": round(len(texts) / batch_s, 1) if batch_s else 0.0,
+        }
+        if measure_memory:
+            gc.collect()
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            m.fuzzy_matrix(texts)
+            result["stages"]["fuzzy_batch"]["peak_bytes"] = tracemalloc.get_traced_memory()[1] - base
+            tracemalloc.stop()
+        hits = 0
+        for text, (_, expected) in zip(texts, corpus):
+            top = m.rank(text, top_n=1)
+            hits += (top[0].key if top else None) == expected
+        result["rank_top1_accuracy"] = round(hits / max(len(texts), 1), 4)
+    return result
+
+
+def _max_rss_kb():
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark IntentMatcher stages on synthetic catalogs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--utterances", type=int, default=500)
+    parser.add_argument("--backends", nargs="+", default=["rapidfuzz", "difflib"],
+                        choices=["rapidfuzz", "difflib"])
+    parser.add_argument("--rapidfuzz-fuzzy-limit", type=int, default=10000,
+                        help="largest catalog that still runs the fuzzy stages with rapidfuzz")
+    parser.add_argument("--difflib-fuzzy-limit", type=int, default=1000,
+                        help="largest catalog that still runs the fuzzy stages with difflib")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc passes (build and stages)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_intent.json")
+    args = parser.parse_args(argv)
+
+    backends = [b for b in args.backends if b != "rapidfuzz" or matcher_mod.RAPIDFUZZ]
+    if len(backends) < len(args.backends):
+        print("⚠️ rapidfuzz not installed — benchmarking difflib only.")
+
+    results = []
+    for backend in backends:
+        limit = args.rapidfuzz_fuzzy_limit if backend == "rapidfuzz" else args.difflib_fuzzy_limit
+        for size in args.sizes:
+            res = bench_size(size, args.utterances, backend, limit, seed=args.seed,
+                             measure_memory=not args.no_memory)
+            results.append(res)
+            summary = ", ".join(f"{name} p50={st['p50_us']}us" for name, st in res["stages"].items()
+                                if "p50_us" in st)
+            print(f"[{backend:9}] {size:>7} commands: build {res['build_ms']}ms | {summary}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "utterances": args.utterances,
+            "seed": args.seed,
+            "max_rss_kb": _max_rss_kb(),
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {args.out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
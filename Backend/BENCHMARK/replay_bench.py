@@ -0,0 +1,159 @@
+# replay_bench.py
+"""
+Recorded-audio replay benchmark.
+
+Pushes WAV files, a directory of WAV files, or raw 16 kHz mono int16 PCM
+(stdin or a TCP socket) through listen() -> find_best_match -> action
+planning, faster than real time, and reports throughput per stage:
+
+    cd Backend
+    python -m BENCHMARK.replay_bench --wav-dir recordings/ --out bench_replay.json
+    sox in.mp3 -t raw -r 16000 -c 1 -b 16 -e signed - | python -m BENCHMARK.replay_bench --stdin
+
+Needs the Vosk model and the BRAIN modules; nothing is spoken. --execute
+also runs the handlers of catalog entries marked "speculative" (side-effect
+free ones such as tell_time); other actions are only planned.
+"""
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import contextlib
+from FUNCTION.LISTEN.listen import listen, COMMAND_GRAMMAR, COMMAND_MODE
+from FUNCTION.LISTEN.sources import WavFileSource, WavDirectorySource, RawPCMSource
+from BRAIN.planner import find_best_match, plan_utterance, run_command, MIN_CONFIDENCE, CATALOG
+from DATA.JARVIS_DLG_DATASET.DLG import websites
+
+
+def _stage_summary(samples_ms):
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "total_ms": round(sum(ordered), 1),
+        "mean_ms": round(sum(ordered) / len(ordered), 2),
+        "p50_ms": round(ordered[len(ordered) // 2], 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+    }
+
+
+def replay(source, command_mode=None, execute=False, quiet=True, max_utterances=None):
+    """
+    Drain `source` utterance by utterance; returns (per-utterance records, report).
+    A source or model error stops the replay and is reported (stderr and report["errors"]).
+    """
+    command_mode = COMMAND_MODE if command_mode is None else command_mode
+    if command_mode and not COMMAND_GRAMMAR.version:
+        COMMAND_GRAMMAR.follow(CATALOG, slot_values={"website": list(websites)})
+    stages = {"asr": [], "match": [], "plan": [], "execute": []}
+    records = []
+    errors = []
+    started = time.perf_counter()
+    while not source.finished and (max_utterances is None or len(records) < max_utterances):
+        t0 = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+                text = listen(command_mode=command_mode, source=source, raise_errors=True)
+        except Exception as e:
+            errors.append({"file": getattr(source, "current", None), "error": f"{type(e).__name__}: {e}"})
+            print(f"❌ Replay stopped: {e}", file=sys.stderr)
+            break
+        stages["asr"].append((time.perf_counter() - t0) * 1000)
+        if not text:
+            continue
+
+        t0 = time.perf_counter()
+        key, _ = find_best_match(text)
+        stages["match"].append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        plans = plan_utterance(text, MIN_CONFIDENCE)
+        stages["plan"].append((time.perf_counter() - t0) * 1000)
+
+        if execute:
+            for _, plan_key, data, slots in plans:
+                if plan_key and data.get("speculative"):
+                    t0 = time.perf_counter()
+                    run_command(plan_key, data, slots)
+                    stages["execute"].append((time.perf_counter() - t0) * 1000)
+
+        records.append({
+            "file": getattr(source, "current", None),
+            "text": text,
+            "command": key,
+            "plan": [plan_key for _, plan_key, _, _ in plans],
+        })
+
+    wall = time.perf_counter() - started
+    audio = source.audio_seconds
+    report = {
+        "audio_seconds": round(audio, 2),
+        "wall_seconds": round(wall, 2),
+        "speedup_x_realtime": round(audio / wall, 2) if wall else None,
+        "rtf": round(wall / audio, 4) if audio else None,
+        "command_mode": bool(command_mode and COMMAND_GRAMMAR.json),
+        "utterances": len(records),
+        "matched": sum(1 for r in records if r["command"]),
+        "utterances_per_second": round(len(records) / wall, 2) if wall else None,
+        "stages": {name: _stage_summary(samples) for name, samples in stages.items()},
+        "errors": errors,
+    }
+    return records, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded audio through ASR, matching and planning.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--wav", help="single 16 kHz mono 16-bit WAV file")
+    group.add_argument("--wav-dir", help="directory of WAV files (recursive, name order)")
+    group.add_argument("--stdin", action="store_true", help="raw 16 kHz mono int16 PCM on stdin")
+    group.add_argument("--socket", metavar="HOST:PORT", help="raw 16 kHz mono int16 PCM from a TCP socket")
+    parser.add_argument("--realtime", action="store_true", help="pace replay at 1x instead of as fast as possible")
+    parser.add_argument("--free-form", action="store_true", help="skip the command grammar")
+    parser.add_argument("--execute", action="store_true", help="run handlers of \"speculative\" commands")
+    parser.add_argument("--max-utterances", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="show listen() output")
+    parser.add_argument("--out", default="bench_replay.json")
+    args = parser.parse_args(argv)
+
+    if args.wav:
+        source = WavFileSource(args.wav, realtime=args.realtime)
+    elif args.wav_dir:
+        source = WavDirectorySource(args.wav_dir, realtime=args.realtime)
+    elif args.stdin:
+        source = RawPCMSource.from_stdin(realtime=args.realtime)
+    else:
+        host, port = args.socket.rsplit(":", 1)
+        source = RawPCMSource.from_socket(host, int(port), realtime=args.realtime)
+
+    records, report = replay(source, command_mode=False if args.free_form else None, execute=args.execute,
+                             quiet=not args.verbose, max_utterances=args.max_utterances)
+    print(f"▶ {report['audio_seconds']}s audio in {report['wall_seconds']}s "
+          f"({report['speedup_x_realtime']}x real time), {report['utterances']} utterances, "
+          f"{report['matched']} matched")
+    for name, st in report["stages"].items():
+        if st["count"]:
+            print(f"  {name:8} n={st['count']:<6} mean={st['mean_ms']}ms p95={st['p95_ms']}ms")
+
+    output = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "realtime": args.realtime,
+            "command_mode": report["command_mode"],
+        },
+        "report": report,
+        "utterances": records,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"✅ Results written to {args.out}")
+    return output
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# actions.py
+"""
+Action registry: catalog `action` string -> handler, resolved once at startup.
+
+Handlers take an ActionContext and return the text to speak, or None to
+use the catalog response. Register a handler with rewrites_response=True
+when it always builds its own text (tell_time appends the time), so the
+speculative path does not pre-synthesize the bare catalog response for it.
+Dispatch is a single dict lookup; every action keeps call/error counts and
+latency.
+"""
+import time
+import threading
+from typing import Callable, Dict, NamedTuple, Optional
+
+
+class ActionContext(NamedTuple):
+    command_key: str
+    slots: dict      # name -> BRAIN.entities.Slot
+    response: str    # catalog response with slots filled in
+
+
+ActionHandler = Callable[[ActionContext], Optional[str]]
+
+
+class ActionRegistry:
+    def __init__(self):
+        self._handlers: Dict[str, ActionHandler] = {}
+        self._rewrites = set()
+        self._stats = {}  # action -> [calls, errors, total_s, max_s, last_s]
+        self._lock = threading.Lock()
+
+    def register(self, action: str, handler: ActionHandler, rewrites_response: bool = False):
+        self._handlers[action] = handler
+        if rewrites_response:
+            self._rewrites.add(action)
+        else:
+            self._rewrites.discard(action)
+
+    def register_many(self, handlers: Dict[str, ActionHandler], rewrites_response: bool = False):
+        for action, handler in handlers.items():
+            self.register(action, handler, rewrites_response)
+
+    def rewrites_response(self, action) -> bool:
+        """True if the handler speaks its own text instead of the catalog response."""
+        return action in self._rewrites
+
+    def __contains__(self, action) -> bool:
+        return action in self._handlers
+
+    def check_catalog(self, commands: dict):
+        """Warn about catalog actions with no handler; returns their names."""
+        unknown = sorted({data.get("action") for data in commands.values()
+                          if data.get("action") and data.get("action") not in self._handlers})
+        if unknown:
+            print(f"⚠️ No handler registered for actions: {', '.join(unknown)} (catalog response only)")
+        return unknown
+
+    def dispatch(self, action: str, ctx: ActionContext) -> Optional[str]:
+        """Run the handler for action. Returns None when there is no handler."""
+        handler = self._handlers.get(action)
+        if handler is None:
+            return None
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = handler(ctx)
+            failed = False
+            return result
+        finally:
+            self._record(action, time.perf_counter() - start, failed)
+
+    def _record(self, action, elapsed, failed):
+        with self._lock:
+            st = self._stats.setdefault(action, [0, 0, 0.0, 0.0, 0.0])
+            st[0] += 1
+            st[1] += failed
+            st[2] += elapsed
+            st[3] = max(st[3], elapsed)
+            st[4] = elapsed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                action: {
+                    "calls": calls,
+                    "errors": errors,
+                    "mean_ms": round(total / calls * 1000.0, 3) if calls else 0.0,
+                    "max_ms": round(peak * 1000.0, 3),
+                    "last_ms": round(last * 1000.0, 3),
+                }
+                for action, (calls, errors, total, peak, last) in self._stats.items()
+            }
@@ -0,0 +1,114 @@
+# catalog.py
+"""
+Hot-reloadable command catalog.
+
+Owns the commands.json snapshot and the IntentMatcher built from it (or
+loaded from the compiled commands.bin when it is up to date). A
+daemon thread polls the file; when it changes, the new matcher is built on
+that thread and swapped in with a single reference assignment, so callers
+that already grabbed `catalog.matcher` keep matching against the old
+snapshot undisturbed. Nothing here touches the TTS or Vosk models.
+"""
+import os
+import json
+import threading
+from BRAIN.matcher import IntentMatcher
+from BRAIN.catalog_compiler import load_compiled
+
+
+class CommandCatalog:
+    def __init__(self, path: str, poll_interval: float = 2.0, use_compiled: bool = True):
+        self.path = path
+        self.use_compiled = use_compiled
+        self.poll_interval = poll_interval
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watch_thread = None
+        self._seen_stat = None
+        self.reloads = 0
+
+        self._stat = self._file_stat()
+        self._matcher = self._build()
+
+    # -----------------------------
+    # Snapshot access
+    # -----------------------------
+    @property
+    def matcher(self) -> IntentMatcher:
+        return self._matcher
+
+    @property
+    def commands(self) -> dict:
+        return self._matcher.commands
+
+    @property
+    def version(self) -> str:
+        return self._matcher.version
+
+    def on_reload(self, callback):
+        """Register callback(matcher) to run after each successful swap."""
+        self._listeners.append(callback)
+
+    # -----------------------------
+    # Loading
+    # -----------------------------
+    def _file_stat(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def _load_commands(self) -> dict:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _build(self) -> IntentMatcher:
+        # the compiled artifact (BRAIN.catalog_compiler) is only used while its hash matches the JSON
+        matcher = load_compiled(self.path) if self.use_compiled else None
+        return matcher or IntentMatcher(self._load_commands())
+
+    def reload(self) -> bool:
+        """Rebuild the matcher from disk and swap it in. Returns True if a new catalog was installed."""
+        with self._reload_lock:
+            try:
+                stat = self._file_stat()
+                matcher = self._build()
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Command catalog reload failed, keeping current one: {e}")
+                return False
+            self._stat = stat
+            if matcher.version == self._matcher.version:
+                return False
+            self._matcher = matcher  # atomic swap
+            self.reloads += 1
+
+        print(f"🔄 Command catalog reloaded ({len(matcher.keys)} commands).")
+        for callback in list(self._listeners):
+            try:
+                callback(matcher)
+            except Exception as e:
+                print(f"[Catalog Listener Error] {e}")
+        return True
+
+    # -----------------------------
+    # Watching
+    # -----------------------------
+    def start_watching(self):
+        if self._watch_thread and self._watch_thread.is_alive():
+            return
+        self._stop.clear()
+        self._watch_thread = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                stat = self._file_stat()
+            except OSError:
+                continue
+            # retry a failed parse only once the file changes again (editors write in steps)
+            if stat != self._stat and stat != self._seen_stat:
+                self._seen_stat = stat
+                self.reload()
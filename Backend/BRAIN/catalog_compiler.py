@@ -0,0 +1,93 @@
+# catalog_compiler.py
+"""
+Compile commands.json into a binary artifact for fast startup.
+
+Layout of commands.bin:
+    header  : magic b"JCAT" | format version (u32) | sha256 of the JSON bytes (32s) | payload size (u64)
+    payload : marshal dump of IntentMatcher.to_tables() (commands, interned
+              phrase/token strings, inverted token index, Aho-Corasick tables)
+
+At load time the file is memory-mapped and the payload is unmarshalled
+straight from the mapping. The artifact is only used when its hash matches
+the current JSON; otherwise callers fall back to parsing the JSON.
+
+Usage (from the Backend directory):
+    python -m BRAIN.catalog_compiler [commands.json] [commands.bin]
+"""
+import os
+import sys
+import mmap
+import json
+import struct
+import marshal
+import hashlib
+from BRAIN.matcher import IntentMatcher, RAPIDFUZZ
+
+MAGIC = b"JCAT"
+FORMAT_VERSION = 3
+_HEADER = struct.Struct("<4sI32sQ")
+
+
+def compiled_path_for(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + ".bin"
+
+
+def _intern(obj):
+    """Intern every string so repeated phrases/tokens are written (and loaded) once."""
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    if isinstance(obj, dict):
+        return {_intern(k): _intern(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_intern(v) for v in obj]
+    if isinstance(obj, tuple):
+        return tuple(_intern(v) for v in obj)
+    return obj
+
+
+def compile_catalog(json_path: str, out_path: str = None) -> str:
+    out_path = out_path or compiled_path_for(json_path)
+    with open(json_path, "rb") as f:
+        raw = f.read()
+    matcher = IntentMatcher(json.loads(raw.decode("utf-8")))
+    payload = marshal.dumps(_intern(matcher.to_tables()))
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, hashlib.sha256(raw).digest(), len(payload))
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, out_path)  # readers never see a half-written artifact
+    return out_path
+
+
+def load_compiled(json_path: str, bin_path: str = None, use_rapidfuzz: bool = RAPIDFUZZ):
+    """IntentMatcher from the compiled artifact, or None if it is missing, stale or unreadable."""
+    bin_path = bin_path or compiled_path_for(json_path)
+    if not os.path.exists(bin_path):
+        return None
+    try:
+        with open(json_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).digest()
+        with open(bin_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if len(mm) < _HEADER.size:
+                return None
+            magic, version, source_hash, size = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != FORMAT_VERSION or source_hash != digest:
+                return None
+            if len(mm) < _HEADER.size + size:
+                return None
+            with memoryview(mm)[_HEADER.size:_HEADER.size + size] as payload:
+                tables = marshal.loads(payload)
+        # a payload with missing or mistyped tables fails here, so it falls back too
+        return IntentMatcher.from_tables(tables, use_rapidfuzz=use_rapidfuzz)
+    except (OSError, ValueError, EOFError, TypeError, KeyError) as e:
+        print(f"⚠️ Compiled catalog unusable, falling back to JSON: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    src = sys.argv[1] if len(sys.argv) > 1 else os.path.join(base_dir, "DATA", "COMMANDS", "commands.json")
+    dst = sys.argv[2] if len(sys.argv) > 2 else None
+    print(f"✅ Compiled catalog written to {compile_catalog(src, dst)}")
@@ -0,0 +1,150 @@
+# dispatcher.py
+"""
+Asynchronous action dispatcher.
+
+Actions run on a bounded worker pool instead of the thread that drives
+listen(). submit() returns a Future right away; each action gets its own
+timeout, can be cancelled, and the dispatcher keeps in-flight counters.
+
+Python threads cannot be killed, so a timed-out or cancelled action that
+is already running is abandoned (its Future fails immediately) and asked
+to stop through cancel_requested(), which long-running handlers may poll.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError, TimeoutError, InvalidStateError
+
+_current = threading.local()
+
+
+class DispatcherFull(RuntimeError):
+    """Raised (through the Future) when max_pending actions are already queued or running."""
+
+
+def cancel_requested() -> bool:
+    """True inside an action whose Future timed out or was cancelled."""
+    event = getattr(_current, "cancel_event", None)
+    return bool(event and event.is_set())
+
+
+class ActionDispatcher:
+    def __init__(self, max_workers: int = 4, max_pending: int = 16, default_timeout: float = 30.0):
+        self.default_timeout = default_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jarvis-action")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = {}  # Future -> action name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.counts = {"submitted": 0, "completed": 0, "failed": 0,
+                       "timed_out": 0, "cancelled": 0, "rejected": 0}
+
+    # -----------------------------
+    # Public Methods
+    # -----------------------------
+    def submit(self, fn, *args, name: str = None, timeout: float = None, **kwargs) -> Future:
+        """Schedule fn(*args, **kwargs). timeout=None uses default_timeout; 0 disables it."""
+        name = name or getattr(fn, "__name__", "action")
+        future = Future()
+        future.cancel_event = threading.Event()
+        future.action_name = name
+        future.timed_out = False
+
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            future.set_exception(DispatcherFull(f"Too many actions in flight; rejected {name}"))
+            return future
+
+        with self._lock:
+            self._in_flight[future] = name
+            self.counts["submitted"] += 1
+        future.add_done_callback(self._on_done)
+
+        timeout = self.default_timeout if timeout is None else timeout
+        if timeout:
+            timer = threading.Timer(timeout, self._expire, args=(future, timeout))
+            timer.daemon = True
+            timer.start()
+            future.add_done_callback(lambda _: timer.cancel())
+
+        self._executor.submit(self._run, future, fn, args, kwargs)
+        return future
+
+    def cancel(self, future: Future) -> bool:
+        """Cancel a queued action, or abandon a running one. Returns False if already finished."""
+        future.cancel_event.set()
+        if future.cancel():
+            return True
+        return self._fail(future, CancelledError(f"{future.action_name} cancelled"))
+
+    def cancel_all(self):
+        with self._lock:
+            futures = list(self._in_flight)
+        for future in futures:
+            self.cancel(future)
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts, in_flight=len(self._in_flight),
+                        actions=sorted(self._in_flight.values()),
+                        max_workers=self.max_workers, max_pending=self.max_pending)
+
+    def shutdown(self, wait: bool = False):
+        self.cancel_all()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    # -----------------------------
+    # Internal Helpers
+    # -----------------------------
+    def _run(self, future, fn, args, kwargs):
+        try:
+            try:
+                if not future.set_running_or_notify_cancel():
+                    return  # cancelled while queued
+            except RuntimeError:
+                return  # timed out while queued
+            _current.cancel_event = future.cancel_event
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                self._fail(future, e)
+            else:
+                try:
+                    future.set_result(result)
+                except InvalidStateError:
+                    pass  # timed out / cancelled meanwhile; result is dropped
+        finally:
+            _current.cancel_event = None
+            self._slots.release()
+
+    def _expire(self, future, timeout):
+        future.timed_out = True
+        future.cancel_event.set()
+        self._fail(future, TimeoutError(f"{future.action_name} timed out after {timeout}s"))
+
+    def _fail(self, future, exc) -> bool:
+        try:
+            future.set_exception(exc)
+            return True
+        except InvalidStateError:
+            return False
+
+    def _on_done(self, future):
+        with self._lock:
+            self._in_flight.pop(future, None)
+            if future.cancelled() or isinstance(future.exception(), CancelledError):
+                self.counts["cancelled"] += 1
+            elif future.timed_out:
+                self.counts["timed_out"] += 1
+            elif future.exception() is None:
+                self.counts["completed"] += 1
+            else:
+                self.counts["failed"] += 1
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
@@ -0,0 +1,85 @@
+# entities.py
+"""
+Slot / entity extraction from gazetteers (e.g. the DLG.py websites table).
+
+Each gazetteer is compiled into a token trie: one dict hop per token, so a
+lookup costs the same whether the gazetteer holds 30 names or 30k. The
+extractor scans the utterance tokens once, taking the leftmost-longest
+entry at each position.
+"""
+import hashlib
+from typing import NamedTuple
+
+_END = "\0"  # trie key marking a complete entry (never a real token)
+
+
+class Slot(NamedTuple):
+    name: str     # slot type, e.g. "website"
+    value: object  # gazetteer value, e.g. the URL
+    text: str     # entry as written in the gazetteer, e.g. "espn"
+    start: int    # token span in the utterance [start, end)
+    end: int
+
+
+class Gazetteer:
+    def __init__(self, slot: str, entries: dict):
+        self.slot = slot
+        self.trie = {}
+        self.max_len = 0
+        digest = hashlib.sha1(slot.encode("utf-8"))
+        for phrase, value in entries.items():
+            digest.update(f"\n{phrase}\t{value}".encode("utf-8"))
+            tokens = phrase.lower().split()
+            if not tokens:
+                continue
+            node = self.trie
+            for tok in tokens:
+                node = node.setdefault(tok, {})
+            node[_END] = (phrase, value)
+            self.max_len = max(self.max_len, len(tokens))
+        self.size = len(entries)
+        self.fingerprint = digest.hexdigest()
+
+    def longest_at(self, tokens, start: int):
+        """(end, phrase, value) for the longest entry starting at tokens[start], or None."""
+        node = self.trie
+        found = None
+        for i in range(start, min(len(tokens), start + self.max_len)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if _END in node:
+                found = (i + 1,) + node[_END]
+        return found
+
+
+class EntityExtractor:
+    def __init__(self, gazetteers=()):
+        self.gazetteers = list(gazetteers)
+        sig = "|".join(g.fingerprint for g in self.gazetteers)
+        self.version = hashlib.sha1(sig.encode("utf-8")).hexdigest()[:12]
+
+    @classmethod
+    def from_tables(cls, tables: dict):
+        """Build from {slot_name: {phrase: value}}."""
+        return cls(Gazetteer(slot, entries) for slot, entries in tables.items())
+
+    def extract(self, tokens) -> dict:
+        """slot name -> Slot for the first (leftmost-longest) hit of each slot type."""
+        slots = {}
+        i = 0
+        while i < len(tokens):
+            best = None
+            for gaz in self.gazetteers:
+                if gaz.slot in slots:
+                    continue
+                hit = gaz.longest_at(tokens, i)
+                if hit and (best is None or hit[0] > best[1][0]):
+                    best = (gaz, hit)
+            if best:
+                gaz, (end, phrase, value) = best
+                slots[gaz.slot] = Slot(gaz.slot, value, phrase, i, end)
+                i = end
+            else:
+                i += 1
+        return slots
@@ -0,0 +1,65 @@
+# intent_cache.py
+"""
+Bounded LRU + TTL cache of normalized utterance -> resolved intent.
+
+Every entry belongs to a catalog version; the first lookup made with a new
+version drops everything cached for the old one, so a catalog change can
+never serve a stale resolution.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+
+class IntentCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._data.clear()
+            self.version = version
+
+    def get(self, key, version):
+        """Return (True, value) on a fresh hit, (False, None) otherwise."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value, version):
+        with self._lock:
+            self._check_version(version)
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "version": self.version,
+            }
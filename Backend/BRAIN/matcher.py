@@ -0,0 +1,439 @@
+# matcher.py
+"""
+Prebuilt intent matcher for the command catalog.
+
+Built once from commands.json so that each utterance only walks the
+characters/tokens it contains instead of every command and keyword:
+  - an Aho-Corasick automaton over all keywords for substring hits
+  - a token -> command inverted index for word-overlap hits
+  - a prebuilt phrase list for the fuzzy fallback
+
+rank() collects candidates from all three stages in one pass and scores
+them; match() keeps the original first-hit-wins order.
+"""
+import json
+import math
+import hashlib
+from typing import NamedTuple
+
+import numpy as np
+
+# Try to use rapidfuzz if present for better fuzzy matching
+try:
+    from rapidfuzz import fuzz, process as rprocess
+    RAPIDFUZZ = True
+except Exception:
+    RAPIDFUZZ = False
+import difflib
+
+# fuzzy thresholds (tuneable)
+RAPIDFUZZ_THRESHOLD = 70
+DIFFLIB_THRESHOLD = 0.6
+FUZZY_THRESHOLD = RAPIDFUZZ_THRESHOLD if RAPIDFUZZ else DIFFLIB_THRESHOLD
+
+# ranking weights: keyword coverage of the utterance, IDF token overlap, fuzzy similarity
+COVERAGE_WEIGHT = 0.5
+OVERLAP_WEIGHT = 0.3
+FUZZY_WEIGHT = 0.2
+SLOT_WEIGHT = 0.3        # bonus for a candidate whose declared "slots" are all filled
+FUZZY_RESCORE_POOL = 16  # lexical candidates that also get a fuzzy score
+COMMON_TOKEN_PHRASES = 256  # tokens in more keywords than this only add to candidates found by rarer tokens
+
+
+def normalize(text: str) -> str:
+    return (text or "").lower().strip()
+
+
+def sort_tokens(text: str) -> str:
+    """token_sort_ratio(a, b) == ratio(sort_tokens(a), sort_tokens(b)); lets phrases be sorted once."""
+    return " ".join(sorted(text.split()))
+
+
+def catalog_version(commands: dict) -> str:
+    """Stable fingerprint of a command catalog (changes whenever any entry changes)."""
+    blob = json.dumps(commands, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()
+
+
+class AhoCorasick:
+    """Multi-pattern substring automaton. Each pattern carries an integer value."""
+
+    def __init__(self, patterns=()):
+        self.goto = [{}]    # node -> {char: node}
+        self.fail = [0]     # node -> fallback node
+        self.out = [()]     # node -> values of patterns ending here (incl. via fail links)
+        for pattern, value in patterns:
+            self._add(pattern, value)
+        self._link()
+
+    @classmethod
+    def from_tables(cls, goto, fail, out):
+        """Rebuild from prebuilt goto/fail/out tables (see BRAIN.catalog_compiler)."""
+        self = cls.__new__(cls)
+        self.goto, self.fail, self.out = goto, fail, out
+        return self
+
+    def _add(self, pattern, value):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            node = nxt
+        self.out[node] = self.out[node] + (value,)
+
+    def _link(self):
+        # breadth-first so that a node's fail target is always finished first
+        queue = list(self.goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                if self.fail[nxt] and self.out[self.fail[nxt]]:
+                    self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter(self, text: str):
+        """Yield (end_index, value) for every pattern occurrence in text."""
+        goto, fail, out = self.goto, self.fail, self.out
+        for value in out[0]:  # empty pattern matches everywhere
+            yield 0, value
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if node:
+                for value in out[node]:
+                    yield i + 1, value
+
+
+class IntentCandidate(NamedTuple):
+    key: str
+    data: dict
+    confidence: float
+    coverage: float
+    overlap: float
+    fuzzy: float
+
+
+class IntentMatcher:
+    """
+    Resolves an utterance to a (command_key, command_data) pair.
+    Matching order is the same as the original find_best_match:
+    substring hit -> token overlap -> fuzzy, earliest catalog entry wins.
+    """
+
+    def __init__(self, commands: dict, use_rapidfuzz: bool = RAPIDFUZZ):
+        self.commands = commands
+        self.keys = list(commands.keys())
+        self.version = catalog_version(commands)
+        self.use_rapidfuzz = use_rapidfuzz and RAPIDFUZZ
+        self.fuzzy_threshold = RAPIDFUZZ_THRESHOLD if self.use_rapidfuzz else DIFFLIB_THRESHOLD
+        self._phrase_rank_cache = None
+
+        self.keyword_to_command = {}
+        self.phrase_list = []       # phrase id -> phrase (every keyword, in catalog order)
+        self.phrase_command = []    # phrase id -> command index
+        self.phrase_tokens = []     # phrase id -> tuple of distinct tokens
+        self.token_index = {}       # token -> phrase ids containing it (ascending)
+        self.command_phrases = []   # command index -> (first, end) phrase id range
+        self.command_slots = []     # command index -> slot names the command takes
+        doc_freq = {}
+        for idx, (key, data) in enumerate(commands.items()):
+            command_tokens = set()
+            first_pid = len(self.phrase_list)
+            self.command_slots.append(tuple(data.get("slots", ())))
+            for kw in data.get("keywords", []):
+                phrase = kw.lower()
+                pid = len(self.phrase_list)
+                self.keyword_to_command[phrase] = key
+                self.phrase_list.append(phrase)
+                self.phrase_command.append(idx)
+                toks = tuple(dict.fromkeys(phrase.split()))
+                self.phrase_tokens.append(toks)
+                for tok in toks:
+                    self.token_index.setdefault(tok, []).append(pid)
+                command_tokens.update(toks)
+            self.command_phrases.append((first_pid, len(self.phrase_list)))
+            for tok in command_tokens:
+                doc_freq[tok] = doc_freq.get(tok, 0) + 1
+
+        n = max(len(self.keys), 1)
+        self.idf = {tok: math.log(1 + n / df) for tok, df in doc_freq.items()}
+        self.unknown_idf = math.log(1 + n)
+        self.phrase_weight = [sum(self.idf[t] for t in toks) for toks in self.phrase_tokens]
+        self.token_index = {tok: tuple(pids) for tok, pids in self.token_index.items()}
+
+        self.automaton = AhoCorasick((phrase, pid) for pid, phrase in enumerate(self.phrase_list))
+        self.phrases = list(self.keyword_to_command.keys())
+        self.phrase_id = {phrase: pid for pid, phrase in enumerate(self.phrase_list)}
+        self.phrase_keys = [self.keyword_to_command[p] for p in self.phrases]
+        self.sorted_phrases = [sort_tokens(p) for p in self.phrases]
+        self.sorted_phrase_list = [sort_tokens(p) for p in self.phrase_list]
+
+    # Everything __init__ derives from the catalog; these are what gets compiled to disk
+    TABLE_FIELDS = (
+        "commands", "keys", "version", "keyword_to_command", "phrase_list", "phrase_command",
+        "phrase_tokens", "token_index", "command_phrases", "command_slots", "idf", "unknown_idf", "phrase_weight",
+        "phrases", "phrase_id", "phrase_keys", "sorted_phrases", "sorted_phrase_list",
+    )
+
+    def to_tables(self) -> dict:
+        tables = {name: getattr(self, name) for name in self.TABLE_FIELDS}
+        tables["ac_goto"] = self.automaton.goto
+        tables["ac_fail"] = self.automaton.fail
+        tables["ac_out"] = self.automaton.out
+        return tables
+
+    @classmethod
+    def from_tables(cls, tables: dict, use_rapidfuzz: bool = RAPIDFUZZ):
+        """Rebuild a matcher from to_tables() output without re-deriving any index."""
+        self = cls.__new__(cls)
+        for name in cls.TABLE_FIELDS:
+            setattr(self, name, tables[name])
+        self.use_rapidfuzz = use_rapidfuzz and RAPIDFUZZ
+        self.fuzzy_threshold = RAPIDFUZZ_THRESHOLD if self.use_rapidfuzz else DIFFLIB_THRESHOLD
+        self._phrase_rank_cache = None
+        self.automaton = AhoCorasick.from_tables(tables["ac_goto"], tables["ac_fail"], tables["ac_out"])
+        return self
+
+    # -----------------------------
+    # Matching stages
+    # -----------------------------
+    def substring_hit(self, text: str):
+        """Index of the first command with a keyword that is a substring of text, or None."""
+        best = None
+        for _, pid in self.automaton.iter(text):
+            idx = self.phrase_command[pid]
+            if best is None or idx < best:
+                best = idx
+                if best == 0:
+                    break
+        return best
+
+    def token_hit(self, tokens):
+        """Index of the first command sharing any word with tokens, or None."""
+        best = None
+        for tok in tokens:
+            pids = self.token_index.get(tok)
+            if pids and (best is None or self.phrase_command[pids[0]] < best):
+                best = self.phrase_command[pids[0]]
+        return best
+
+    def fuzzy_hit(self, text: str):
+        """Command key of the closest keyword above the fuzzy threshold, or None."""
+        if not self.phrases:
+            return None
+        if self.use_rapidfuzz:
+            best = rprocess.extractOne(sort_tokens(text), self.sorted_phrases, scorer=fuzz.ratio)
+            if best and best[1] >= self.fuzzy_threshold:
+                return self.phrase_keys[best[2]]
+        else:
+            best = difflib.get_close_matches(text, self.phrases, n=1, cutoff=self.fuzzy_threshold)
+            if best:
+                return self.keyword_to_command.get(best[0])
+        return None
+
+    def match(self, user_input: str):
+        text = normalize(user_input)
+        if not text:
+            return None, None
+
+        idx = self.substring_hit(text)
+        if idx is None:
+            idx = self.token_hit(set(text.split()))
+        if idx is not None:
+            key = self.keys[idx]
+            return key, self.commands[key]
+
+        key = self.fuzzy_hit(text)
+        if key:
+            return key, self.commands[key]
+        return None, None
+
+    # -----------------------------
+    # Batch fuzzy scoring
+    # -----------------------------
+    def fuzzy_matrix(self, utterances, workers: int = -1):
+        """
+        Score many utterances against every phrase in self.phrases at once.
+        Returns a float32 array of shape (len(utterances), len(self.phrases)) on a
+        0..100 scale for both backends. workers is passed to rapidfuzz (-1 = all cores).
+        The difflib path prunes with the quick ratios like get_close_matches does, so
+        pairs below DIFFLIB_THRESHOLD are left at 0.
+        """
+        queries = [normalize(u) for u in utterances]
+        if not queries or not self.phrases:
+            return np.zeros((len(queries), len(self.phrases)), dtype=np.float32)
+        if self.use_rapidfuzz:
+            return rprocess.cdist([sort_tokens(q) for q in queries], self.sorted_phrases, scorer=fuzz.ratio,
+                                  dtype=np.float32, workers=workers)
+
+        # difflib: same orientation as get_close_matches (query in seq2, phrase in seq1;
+        # ratio() is not symmetric), so SequenceMatcher's seq2 analysis is reused per query
+        scores = np.zeros((len(queries), len(self.phrases)), dtype=np.float32)
+        sm = difflib.SequenceMatcher()
+        for row, query in enumerate(queries):
+            sm.set_seq2(query)
+            for col, phrase in enumerate(self.phrases):
+                sm.set_seq1(phrase)
+                if sm.real_quick_ratio() >= DIFFLIB_THRESHOLD and sm.quick_ratio() >= DIFFLIB_THRESHOLD:
+                    scores[row, col] = sm.ratio() * 100.0
+        return scores
+
+    def fuzzy_match_batch(self, utterances, workers: int = -1):
+        """Best fuzzy (command_key, score) per utterance, or (None, score) below the threshold."""
+        scores = self.fuzzy_matrix(utterances, workers=workers)
+        if not scores.size:
+            return [(None, 0.0) for _ in range(len(scores))]
+        if self.use_rapidfuzz:
+            best_cols = scores.argmax(axis=1)
+        else:
+            # ties go to the larger phrase, as in get_close_matches (nlargest over (score, phrase))
+            tied = scores == scores.max(axis=1, keepdims=True)
+            best_cols = np.where(tied, self._phrase_rank(), -1).argmax(axis=1)
+        best_scores = scores[np.arange(len(scores)), best_cols]
+        cutoff = self._fuzzy_cutoff() * 100.0
+        return [(self.phrase_keys[col] if score >= cutoff else None, float(score))
+                for col, score in zip(best_cols, best_scores)]
+
+    def _phrase_rank(self):
+        """Rank of each entry of self.phrases in string order (built on first use)."""
+        if self._phrase_rank_cache is None:
+            rank = np.empty(len(self.phrases), dtype=np.int64)
+            rank[sorted(range(len(self.phrases)), key=self.phrases.__getitem__)] = np.arange(len(self.phrases))
+            self._phrase_rank_cache = rank
+        return self._phrase_rank_cache
+
+    # -----------------------------
+    # Ranked resolution
+    # -----------------------------
+    def _fuzzy_scores(self, text: str, pids, limit: int):
+        """phrase id -> similarity in 0..1 for the given phrases plus the global top `limit` (0 = no global sweep)."""
+        scores = {}
+        if not self.phrase_list:
+            return scores
+        if self.use_rapidfuzz:
+            query = sort_tokens(text)
+            choices = {pid: self.sorted_phrase_list[pid] for pid in pids}
+            for _, score, pid in rprocess.extract(query, choices, scorer=fuzz.ratio, limit=None):
+                scores[pid] = score / 100.0
+            if limit:
+                for _, score, pid in rprocess.extract(query, self.sorted_phrase_list, scorer=fuzz.ratio,
+                                                      limit=limit, score_cutoff=self.fuzzy_threshold):
+                    scores[pid] = score / 100.0
+        else:
+            sm = difflib.SequenceMatcher()
+            sm.set_seq2(text)
+            for pid in pids:
+                sm.set_seq1(self.phrase_list[pid])
+                scores[pid] = sm.ratio()
+            if limit:
+                for phrase in difflib.get_close_matches(text, self.phrases, n=limit, cutoff=self.fuzzy_threshold):
+                    pid = self.phrase_id[phrase]
+                    sm.set_seq1(phrase)
+                    scores[pid] = sm.ratio()
+        return scores
+
+    def rank(self, user_input: str, top_n: int = 3, slots=None):
+        """
+        Score every command reachable from the utterance and return the best
+        top_n as IntentCandidate, highest confidence first.
+        A command is a candidate if a keyword is a substring of the input, shares
+        a token with it, or is fuzzy-similar above the fuzzy threshold. The fuzzy
+        sweep over the whole catalog only runs when no lexical candidate is strong
+        enough to beat any fuzzy-only one; otherwise just the lexical pool is rescored.
+        slots (from BRAIN.entities) boosts candidates whose declared slots are all filled.
+        """
+        text = normalize(user_input)
+        if not text:
+            return []
+
+        coverage = {}  # command index -> best keyword coverage
+        overlap = {}   # command index -> best IDF-weighted token overlap
+        fuzzy = {}     # command index -> best fuzzy similarity
+        size = len(text)
+
+        # substring stage: one automaton walk over the characters
+        for end, pid in self.automaton.iter(text):
+            length = len(self.phrase_list[pid])
+            start = end - length
+            bounded = (start == 0 or text[start - 1] == " ") and (end == size or text[end] == " ")
+            cov = length / size * (1.0 if bounded else 0.5)
+            idx = self.phrase_command[pid]
+            if cov >= coverage.get(idx, -1.0):
+                coverage[idx] = cov
+
+        # token stage: IDF-weighted Dice overlap per keyword via the inverted index.
+        # Posting lists of very common tokens are only walked when no rarer token hit
+        # anything; otherwise they just add their weight to the phrases already found.
+        tokens = set(text.split())
+        query_weight = sum(self.idf.get(t, self.unknown_idf) for t in tokens)
+        postings = [(tok, self.token_index[tok]) for tok in tokens if tok in self.token_index]
+        rare = [(tok, pids) for tok, pids in postings if len(pids) <= COMMON_TOKEN_PHRASES]
+        common = [(tok, pids) for tok, pids in postings if len(pids) > COMMON_TOKEN_PHRASES]
+        shared = {}
+        for tok, pids in (rare or common):
+            w = self.idf[tok]
+            for pid in pids:
+                shared[pid] = shared.get(pid, 0.0) + w
+        if rare:
+            for tok, _ in common:
+                w = self.idf[tok]
+                for pid in shared:
+                    if tok in self.phrase_tokens[pid]:
+                        shared[pid] += w
+        for pid, w in shared.items():
+            ov = 2.0 * w / (self.phrase_weight[pid] + query_weight)
+            idx = self.phrase_command[pid]
+            if ov > overlap.get(idx, 0.0):
+                overlap[idx] = ov
+
+        # fuzzy stage: rescore the strongest lexical candidates and add fuzzy-only ones
+        lexical = set(coverage) | set(overlap)
+        lexical_conf = {i: COVERAGE_WEIGHT * coverage.get(i, 0.0) + OVERLAP_WEIGHT * overlap.get(i, 0.0)
+                        for i in lexical}
+        pool = sorted(lexical, key=lambda i: (-lexical_conf[i], i))
+        pool_pids = [pid for idx in pool[:max(FUZZY_RESCORE_POOL, top_n * 4)]
+                     for pid in range(*self.command_phrases[idx])]
+        # a fuzzy-only command scores at most FUZZY_WEIGHT (+ the slot bonus); once the best
+        # lexical candidate is above that, sweeping every phrase cannot change the winner
+        ceiling = FUZZY_WEIGHT + (SLOT_WEIGHT if slots else 0.0)
+        sweep = 0 if max(lexical_conf.values(), default=0.0) > ceiling else max(top_n, 1)
+        for pid, score in self._fuzzy_scores(text, pool_pids, sweep).items():
+            idx = self.phrase_command[pid]
+            if idx not in lexical and score < self._fuzzy_cutoff():
+                continue
+            if score > fuzzy.get(idx, 0.0):
+                fuzzy[idx] = score
+
+        candidates = []
+        for idx in lexical | set(fuzzy):
+            cov, ov, fz = coverage.get(idx, 0.0), overlap.get(idx, 0.0), fuzzy.get(idx, 0.0)
+            conf = COVERAGE_WEIGHT * cov + OVERLAP_WEIGHT * ov + FUZZY_WEIGHT * fz
+            wanted = self.command_slots[idx]
+            if wanted and slots and all(name in slots for name in wanted):
+                conf = min(1.0, conf + SLOT_WEIGHT)
+            candidates.append((-conf, idx, cov, ov, fz))
+        candidates.sort()
+
+        ranked = []
+        for neg_conf, idx, cov, ov, fz in candidates[:top_n]:
+            key = self.keys[idx]
+            ranked.append(IntentCandidate(key, self.commands[key], round(-neg_conf, 4),
+                                          round(cov, 4), round(ov, 4), round(fz, 4)))
+        return ranked
+
+    def _fuzzy_cutoff(self):
+        return self.fuzzy_threshold / 100.0 if self.use_rapidfuzz else self.fuzzy_threshold
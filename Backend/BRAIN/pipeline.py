@@ -0,0 +1,46 @@
+# pipeline.py
+"""
+Compound-utterance splitting: "open chrome and turn the volume up" ->
+["open chrome", "turn the volume up"].
+
+Splits on conjunctions / punctuation, but never inside a catalog keyword
+(found with the matcher's keyword automaton), so phrases that contain
+"and" stay whole.
+"""
+import re
+
+# longest first so "and then" wins over "and"
+CONJUNCTIONS = ("and after that", "after that", "and then", "and also", "then", "also", "and", "plus")
+_CONJ = "(?:" + "|".join(re.escape(c) for c in CONJUNCTIONS) + ")"
+_BOUNDARY_RE = re.compile(r"\s*[,;]\s*(?:" + _CONJ + r"\s+)?|\s+" + _CONJ + r"\s+")
+
+
+def _protected_spans(text: str, matcher):
+    spans = []
+    for end, pid in matcher.automaton.iter(text):
+        start = end - len(matcher.phrase_list[pid])
+        if start < end:
+            spans.append((start, end))
+    return spans
+
+
+def split_clauses(text: str, matcher=None):
+    """Split an utterance into clauses; boundaries inside a keyword hit are ignored."""
+    text = (text or "").strip()
+    if not text:
+        return []
+    spans = _protected_spans(text, matcher) if matcher is not None else []
+
+    clauses = []
+    last = 0
+    for m in _BOUNDARY_RE.finditer(text):
+        if any(start < m.end() and m.start() < end for start, end in spans):
+            continue
+        clause = text[last:m.start()].strip()
+        if clause:
+            clauses.append(clause)
+        last = m.end()
+    tail = text[last:].strip()
+    if tail:
+        clauses.append(tail)
+    return clauses
@@ -0,0 +1,140 @@
+# planner.py
+"""
+Utterance -> command resolution and planning, without the speaker.
+
+Holds the command catalog, the entity gazetteers, the action registry and the
+intent cache, and turns text into ranked candidates or per-clause plans.
+Importing this module loads no TTS model and starts no thread or file
+watcher, so offline tools (BENCHMARK/replay_bench.py) can plan utterances
+without a speaker; BRAIN.processor adds speech, dispatch and speculation.
+"""
+import os
+import datetime
+import webbrowser
+from DATA.JARVIS_DLG_DATASET.DLG import websites
+from BRAIN.matcher import normalize
+from BRAIN.intent_cache import IntentCache
+from BRAIN.catalog import CommandCatalog
+from BRAIN.entities import EntityExtractor
+from BRAIN.pipeline import split_clauses
+from BRAIN.actions import ActionRegistry, ActionContext
+
+# --- Dynamically get the path to commands.json ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMANDS_PATH = os.path.join(BASE_DIR, "DATA", "COMMANDS", "commands.json")
+
+# Catalog + prebuilt matcher (BRAIN.processor starts watching commands.json for edits)
+CATALOG = CommandCatalog(COMMANDS_PATH)
+
+# Gazetteers for parameterized intents (slot name -> {spoken name: value})
+ENTITIES = EntityExtractor.from_tables({"website": websites})
+
+# -----------------------------
+# Action handlers (resolved once at startup)
+# -----------------------------
+def _tell_time(ctx):
+    current_time = datetime.datetime.now().strftime("%I:%M %p")
+    return f"{ctx.response} {current_time}"
+
+def _open_website(ctx):
+    webbrowser.open(ctx.slots["website"].value)
+
+ACTIONS = ActionRegistry()
+ACTIONS.register("tell_time", _tell_time, rewrites_response=True)
+ACTIONS.register("open_website", _open_website)
+try:
+    from FUNCTION.SYSTEM.control import ACTIONS as SYSTEM_ACTIONS
+    ACTIONS.register_many(SYSTEM_ACTIONS)
+except Exception as e:
+    print(f"⚠️ System actions unavailable: {e}")
+ACTIONS.check_catalog(CATALOG.commands)
+CATALOG.on_reload(lambda matcher: ACTIONS.check_catalog(matcher.commands))
+
+# Repeated short commands resolve from here; keyed on the catalog version too
+INTENT_CACHE = IntentCache(maxsize=1024, ttl=600.0)
+
+# Spoken commands below this confidence are "not understood" rather than guessed
+MIN_CONFIDENCE = 0.35
+
+def resolve(user_input: str, top_n: int = 3):
+    """(ranked IntentCandidates, slots) — slots are extracted from the same normalized tokens."""
+    matcher = CATALOG.matcher
+    text = normalize(user_input)
+    version = (matcher.version, ENTITIES.version)
+    hit, result = INTENT_CACHE.get((text, top_n), version)
+    if not hit:
+        slots = ENTITIES.extract(text.split())
+        result = (matcher.rank(text, top_n=top_n, slots=slots), slots)
+        INTENT_CACHE.put((text, top_n), result, version)
+    return result
+
+def rank_matches(user_input: str, top_n: int = 3):
+    """Top-N scored command candidates (IntentCandidate) for the utterance."""
+    return resolve(user_input, top_n=top_n)[0]
+
+def resolve_intent(user_input: str, min_confidence: float = 0.0):
+    """Best (command_key, command_data, slots) for the utterance, or (None, None, {})."""
+    ranked, slots = resolve(user_input, top_n=1)
+    if ranked and ranked[0].confidence >= min_confidence:
+        return ranked[0].key, ranked[0].data, slots
+    return None, None, slots
+
+def find_best_match(user_input: str, min_confidence: float = 0.0):
+    command_key, data, _ = resolve_intent(user_input, min_confidence)
+    return command_key, data
+
+def fuzzy_match_batch(utterances, workers: int = -1):
+    """Resolve a burst of utterances with one batched fuzzy pass -> [(command_key, command_data)]."""
+    matcher = CATALOG.matcher
+    results = []
+    for key, _ in matcher.fuzzy_match_batch(utterances, workers=workers):
+        results.append((key, matcher.commands[key]) if key else (None, None))
+    return results
+
+
+def _fill_response(response: str, slots) -> str:
+    """Fill {slot} placeholders in a catalog response with the spoken slot text."""
+    try:
+        return response.format(**{name: slot.text for name, slot in (slots or {}).items()})
+    except (KeyError, IndexError, ValueError):
+        return response
+
+
+def run_command(command_key, data, slots=None) -> str:
+    """
+    Runs the command's action through the ACTIONS registry and returns the text
+    to speak (does not speak it). Actions without a handler just return the response.
+    slots: extracted entities (name -> BRAIN.entities.Slot) passed through to the action.
+    """
+    if not command_key or not data:
+        return "Sorry, I didn't understand that command."
+
+    slots = slots or {}
+    response = _fill_response(data.get("response", "Done."), slots)
+    action = data.get("action")  # e.g. "open_chrome" or "tell_time"
+
+    missing = [name for name in data.get("slots", []) if name not in slots]
+    if missing:
+        return f"Sorry, which {missing[0]} should I use?"
+
+    return ACTIONS.dispatch(action, ActionContext(command_key, slots, response)) or response
+
+
+def plan_utterance(user_input: str, min_confidence: float = 0.0):
+    """Split into clauses and resolve each -> [(clause, command_key, command_data, slots)]."""
+    text = normalize(user_input)
+    matcher = CATALOG.matcher
+
+    # a clause that resolves to nothing is glued back onto the previous one, but only
+    # when that changes what the previous clause means (a wrong split, not trailing noise)
+    plans = []
+    for clause in split_clauses(text, matcher):
+        key, data, slots = resolve_intent(clause, min_confidence)
+        if not key and plans:
+            merged = f"{plans[-1][0]} {clause}"
+            merged_key, merged_data, merged_slots = resolve_intent(merged, min_confidence)
+            if merged_key and merged_key != plans[-1][1]:
+                plans[-1] = (merged, merged_key, merged_data, merged_slots)
+                continue
+        plans.append((clause, key, data, slots))
+    return plans
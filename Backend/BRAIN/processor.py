@@ -1,101 +1,154 @@
 # processor.py (refactored)
-import json
-import os
-import datetime
+import threading
+from concurrent.futures import Future, CancelledError, TimeoutError
 from FUNCTION.SPEAK.speak import JarvisSpeaker
+from BRAIN.matcher import normalize
+from BRAIN.planner import (CATALOG, ENTITIES, ACTIONS, MIN_CONFIDENCE, find_best_match, run_command,
+                           plan_utterance, _fill_response)
+from BRAIN.dispatcher import ActionDispatcher, DispatcherFull
+from BRAIN.speculation import SpeculativeResolver
 
 speaker = JarvisSpeaker()
 
-# Try to use rapidfuzz if present for better fuzzy matching
-try:
-    from rapidfuzz import fuzz, process as rprocess
-    RAPIDFUZZ = True
-except Exception:
-    import difflib
-    RAPIDFUZZ = False
-
-# --- Dynamically get the path to commands.json ---
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-COMMANDS_PATH = os.path.join(BASE_DIR, "DATA", "COMMANDS", "commands.json")
-
-with open(COMMANDS_PATH, "r", encoding="utf-8") as f:
-    COMMANDS = json.load(f)
-
-# Precompute all keyword -> command mapping for faster matching
-_KEYWORD_TO_COMMAND = {}
-for key, data in COMMANDS.items():
-    for kw in data.get("keywords", []):
-        _KEYWORD_TO_COMMAND[kw.lower()] = key
-
-# fuzzy thresholds (tuneable)
-FUZZY_THRESHOLD = 70 if RAPIDFUZZ else 0.6
-
-def find_best_match(user_input: str):
-    user_input = (user_input or "").lower().strip()
-    if not user_input:
-        return None, None
-
-    # 1) direct substring match (fast)
-    for key, data in COMMANDS.items():
-        for phrase in data.get("keywords", []):
-            phrase_l = phrase.lower()
-            if phrase_l in user_input:
-                return key, data
-
-    # 2) word-token overlap: checks if any keyword words occur in input
-    tokens = set(user_input.split())
-    for key, data in COMMANDS.items():
-        for phrase in data.get("keywords", []):
-            if set(phrase.lower().split()).intersection(tokens):
-                return key, data
-
-    # 3) fuzzy matching: rapidfuzz (preferred) or difflib fallback
-    all_phrases = list(_KEYWORD_TO_COMMAND.keys())
-    if RAPIDFUZZ:
-        # get best match and its score
-        best = rprocess.extractOne(user_input, all_phrases, scorer=fuzz.token_sort_ratio)
-        if best and best[1] >= FUZZY_THRESHOLD:
-            matched_phrase = best[0]
-            command_key = _KEYWORD_TO_COMMAND.get(matched_phrase)
-            return command_key, COMMANDS[command_key]
-    else:
-        best = difflib.get_close_matches(user_input, all_phrases, n=1, cutoff=FUZZY_THRESHOLD)
-        if best:
-            command_key = _KEYWORD_TO_COMMAND.get(best[0])
-            return command_key, COMMANDS[command_key]
-
-    return None, None
-
-
-def execute_command(command_key, data):
-    """
-    Decides how to run the action. Keep TTS feedback here, but delegate heavy actions to control.py
-    """
-    if not command_key or not data:
-        speaker.speak("Sorry, I didn't understand that command.")
-        return
+# Edits to commands.json are picked up in the background
+CATALOG.start_watching()
 
-    response = data.get("response", "Done.")
-    action = data.get("action")  # e.g. "open_chrome" or "tell_time"
+# Actions run here, off the listening thread, with per-action timeouts
+DISPATCHER = ActionDispatcher(max_workers=4, max_pending=16, default_timeout=30.0)
 
-    # If action is a special 'internal' type
-    if action == "tell_time":
-        current_time = datetime.datetime.now().strftime("%I:%M %p")
-        response = f"{response} {current_time}"
-        speaker.speak(response)
-        return
 
-    # For system actions, delegate to control module
+def execute_command(command_key, data, slots=None):
+    """Run a single resolved command and speak its response. Returns the spoken text."""
+    response = run_command(command_key, data, slots)
+    speaker.speak(response)
+    return response
+
+
+def _action_response(command_key, future) -> str:
     try:
-        from FUNCTION.SYSTEM.control import execute_system_command
-    except Exception:
-        execute_system_command = None
+        return future.result()
+    except DispatcherFull:
+        return "I'm still busy with earlier commands."
+    except TimeoutError:
+        return f"Sorry, {command_key.replace('_', ' ')} is taking too long."
+    except CancelledError:
+        return f"Cancelled {command_key.replace('_', ' ')}."
+    except Exception as e:
+        print(f"[ERROR] Action {command_key} failed: {e}")
+        return f"Sorry, {command_key.replace('_', ' ')} failed."
+
+
+def dispatch_utterance(user_input: str, min_confidence: float = MIN_CONFIDENCE) -> Future:
+    """
+    Resolve a (possibly compound) utterance and hand its actions to DISPATCHER.
+    Returns at once with a Future for the merged response text, which is spoken
+    when every action has finished. Independent actions run concurrently; catalog
+    entries marked "exclusive" (shutdown, restart) run last, one at a time.
+    A catalog "timeout" (seconds) overrides the dispatcher default per action.
+    """
+    plans = plan_utterance(user_input, min_confidence)
+    done = Future()
+    if not any(key for _, key, _, _ in plans):
+        done.set_result(execute_command(None, None))
+        return done
+
+    responses = [None] * len(plans)
+    concurrent = [i for i, (_, key, data, _) in enumerate(plans) if key and not data.get("exclusive")]
+    exclusive = [i for i, (_, key, data, _) in enumerate(plans) if key and data.get("exclusive")]
+    for i, (clause, key, _, _) in enumerate(plans):
+        if not key:
+            responses[i] = f"I couldn't understand {clause}."
+
+    def submit(i):
+        _, key, data, slots = plans[i]
+        return _submit_action(key, data, slots)
+
+    def finish():
+        response = " ".join(r for r in responses if r)
+        speaker.speak(response)
+        done.set_result(response)
+
+    def run_exclusive(j):
+        if j == len(exclusive):
+            finish()
+            return
+        i = exclusive[j]
+
+        def after(future):
+            responses[i] = _action_response(plans[i][1], future)
+            run_exclusive(j + 1)
+        submit(i).add_done_callback(after)
+
+    remaining = [len(concurrent)]
+    lock = threading.Lock()
+
+    def on_concurrent_done(i, future):
+        responses[i] = _action_response(plans[i][1], future)
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            run_exclusive(0)
+
+    if not concurrent:
+        run_exclusive(0)
+    for i in concurrent:
+        submit(i).add_done_callback(lambda f, i=i: on_concurrent_done(i, f))
+    return done
+
+
+def process_utterance(user_input: str, min_confidence: float = MIN_CONFIDENCE):
+    """Blocking form of dispatch_utterance(): returns the merged response text."""
+    return dispatch_utterance(user_input, min_confidence).result()
+
+
+# -----------------------------
+# Speculative resolution on ASR partials
+# -----------------------------
+# Start catalog entries marked "speculative" before the final hypothesis arrives
+SPECULATIVE_EARLY_EXECUTE = False
+
+def _speculative_response(command_key, data, slots):
+    """Text to pre-synthesize for an armed command; None when its handler writes its own."""
+    if ACTIONS.rewrites_response(data.get("action")):
+        return None
+    return _fill_response(data.get("response", "Done."), slots)
+
+def _resolve_partial(text):
+    """Top candidate and slots for an ASR partial; unlike resolve(), partials never enter INTENT_CACHE."""
+    text = normalize(text)
+    slots = ENTITIES.extract(text.split())
+    return CATALOG.matcher.rank(text, top_n=1, slots=slots), slots
+
+def _submit_action(command_key, data, slots):
+    return DISPATCHER.submit(run_command, command_key, data, slots, name=command_key, timeout=data.get("timeout"))
+
+SPECULATION = SpeculativeResolver(
+    resolve_fn=_resolve_partial,
+    plan_fn=lambda text: plan_utterance(text, MIN_CONFIDENCE),
+    prewarm_fn=speaker.prewarm,
+    execute_fn=_submit_action,
+    cancel_fn=DISPATCHER.cancel,
+    response_fn=_speculative_response,
+    min_confidence=0.8,
+    early_execute=SPECULATIVE_EARLY_EXECUTE,
+)
+
+
+def dispatch_final(user_input: str, min_confidence: float = MIN_CONFIDENCE) -> Future:
+    """
+    dispatch_utterance() for a final ASR hypothesis that was streamed through
+    SPECULATION.feed_partial: reuses the early-started action when it agrees.
+    """
+    early = SPECULATION.commit(user_input)
+    if early is None:
+        return dispatch_utterance(user_input, min_confidence)
 
-    if action and execute_system_command:
-        # Pass action to system controller which returns a friendly response
-        act_response = execute_system_command(action, None)
-        speaker.speak(act_response or response)
-        return
+    done = Future()
 
-    # Default: speak the response
-    speaker.speak(response)
+    def finish(future):
+        response = _action_response(future.action_name, future)
+        speaker.speak(response)
+        done.set_result(response)
+    early.add_done_callback(finish)
+    return done
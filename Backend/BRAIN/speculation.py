@@ -0,0 +1,103 @@
+# speculation.py
+"""
+Speculative intent resolution on streaming ASR partials.
+
+listen() reports every new (changed) partial hypothesis. Once partials
+resolve to the same command with high confidence for `stable_partials`
+updates in a row, the resolver "arms" that command:
+  - the spoken response is pre-synthesized (TTS cache warm-up)
+  - with early_execute, commands marked "speculative": true in the catalog
+    (side-effect free ones like tell_time) are started right away
+
+When the final hypothesis arrives, commit() checks that it plans to exactly
+the armed command (one clause, same command, same slots). If so, the early
+work is reused; otherwise it is cancelled and the caller resolves normally.
+"""
+import threading
+
+
+class SpeculativeResolver:
+    def __init__(self, resolve_fn, plan_fn, prewarm_fn=None, execute_fn=None, cancel_fn=None,
+                 response_fn=None, min_confidence: float = 0.8, stable_partials: int = 1,
+                 early_execute: bool = False):
+        """
+        resolve_fn(text) -> (ranked IntentCandidates, slots)
+        plan_fn(text) -> [(clause, command_key, command_data, slots)]
+        prewarm_fn(text) pre-synthesizes a response; response_fn(key, data, slots) -> text, or None to skip
+        execute_fn(key, data, slots) -> Future of the response; cancel_fn(future) drops it
+        """
+        self.resolve_fn = resolve_fn
+        self.plan_fn = plan_fn
+        self.prewarm_fn = prewarm_fn
+        self.execute_fn = execute_fn
+        self.cancel_fn = cancel_fn
+        self.response_fn = response_fn
+        self.min_confidence = min_confidence
+        self.stable_partials = stable_partials
+        self.early_execute = early_execute
+        self._lock = threading.Lock()
+        self.stats = {"armed": 0, "agreed": 0, "disagreed": 0, "early_executed": 0}
+        self._last_key = None
+        self._streak = 0
+        self._armed = None  # (key, slots, early_future)
+
+    def reset(self):
+        """Drop any armed command (cancelling early work), e.g. when listen() timed out."""
+        with self._lock:
+            self._last_key = None
+            self._streak = 0
+            self._disarm_locked()
+
+    def feed_partial(self, partial: str):
+        """Called with each new partial hypothesis from the recognizer."""
+        ranked, slots = self.resolve_fn(partial)
+        top = ranked[0] if ranked else None
+        with self._lock:
+            if top is None or top.confidence < self.min_confidence:
+                self._last_key, self._streak = None, 0
+                return
+            self._streak = self._streak + 1 if top.key == self._last_key else 1
+            self._last_key = top.key
+            if self._streak < self.stable_partials:
+                return
+            if self._armed and self._armed[0] == top.key and self._armed[1] == slots:
+                return
+            self._disarm_locked()
+            early = None
+            if self.early_execute and self.execute_fn and top.data.get("speculative"):
+                early = self.execute_fn(top.key, top.data, slots)
+                self.stats["early_executed"] += 1
+            self._armed = (top.key, slots, early)
+            self.stats["armed"] += 1
+
+        if self.prewarm_fn and self.response_fn:
+            response = self.response_fn(top.key, top.data, slots)
+            if response:
+                self.prewarm_fn(response)
+
+    def commit(self, final_text: str):
+        """
+        Returns the early-execution Future if the final hypothesis agrees with the
+        armed command and it was started early, otherwise None (resolve normally).
+        Always resets the resolver for the next utterance.
+        """
+        with self._lock:
+            armed, self._armed = self._armed, None
+            self._last_key, self._streak = None, 0
+        if not armed:
+            return None
+
+        key, slots, early = armed
+        plans = self.plan_fn(final_text) if final_text else []
+        agrees = len(plans) == 1 and plans[0][1] == key and plans[0][3] == slots
+        self.stats["agreed" if agrees else "disagreed"] += 1
+        if agrees:
+            return early
+        if early is not None and self.cancel_fn:
+            self.cancel_fn(early)
+        return None
+
+    def _disarm_locked(self):
+        if self._armed and self._armed[2] is not None and self.cancel_fn:
+            self.cancel_fn(self._armed[2])
+        self._armed = None
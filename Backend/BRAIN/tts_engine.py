@@ -1,8 +1,47 @@
 # tts_engine.py
 import os
+import hashlib
 import threading
+import functools
 from TTS.utils.synthesizer import Synthesizer
 
+TTS_MODEL_DIR = "tts_models--en--ljspeech--fast_pitch"
+VOCODER_MODEL_DIR = "vocoder_models--en--ljspeech--hifigan_v2"
+FINGERPRINT_SAMPLE = 1 << 20   # bytes hashed from each end of a checkpoint
+
+
+def model_files(base_dir: str) -> dict:
+    """Checkpoint and config paths of the TTS model + vocoder under base_dir."""
+    return {
+        "tts_checkpoint": os.path.join(base_dir, TTS_MODEL_DIR, "model_file.pth"),
+        "tts_config_path": os.path.join(base_dir, TTS_MODEL_DIR, "config.json"),
+        "vocoder_checkpoint": os.path.join(base_dir, VOCODER_MODEL_DIR, "model_file.pth"),
+        "vocoder_config": os.path.join(base_dir, VOCODER_MODEL_DIR, "config.json"),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path: str, size: int, mtime_ns: int) -> str:
+    """Size + first/last FINGERPRINT_SAMPLE bytes (whole file when small); memoized per file version."""
+    h = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        h.update(f.read(FINGERPRINT_SAMPLE))
+        if size > 2 * FINGERPRINT_SAMPLE:
+            f.seek(-FINGERPRINT_SAMPLE, os.SEEK_END)
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def model_fingerprint(base_dir: str) -> str:
+    """Cheap content hash of every checkpoint/config; changes whenever any of them does."""
+    h = hashlib.sha256()
+    for name, path in sorted(model_files(base_dir).items()):
+        st = os.stat(path)
+        h.update(name.encode())
+        h.update(_file_digest(path, st.st_size, st.st_mtime_ns).encode())
+    return h.hexdigest()[:16]
+
+
 class TTSEngine:
     _instance = None
     _lock = threading.Lock()
@@ -15,19 +54,12 @@ class TTSEngine:
             return cls._instance
 
     def _initialize(self, base_dir=r"D:\JARVIS\Backend\DATA\SPEAK MODAL\local_tts_modal", device="cpu"):
-        tts_model_path = os.path.join(base_dir, "tts_models--en--ljspeech--fast_pitch", "model_file.pth")
-        tts_config_path = os.path.join(base_dir, "tts_models--en--ljspeech--fast_pitch", "config.json")
-        vocoder_model_path = os.path.join(base_dir, "vocoder_models--en--ljspeech--hifigan_v2", "model_file.pth")
-        vocoder_config_path = os.path.join(base_dir, "vocoder_models--en--ljspeech--hifigan_v2", "config.json")
-
         # you may want to expose device selection here (cuda vs cpu)
-        self.synthesizer = Synthesizer(
-            tts_checkpoint=tts_model_path,
-            tts_config_path=tts_config_path,
-            vocoder_checkpoint=vocoder_model_path,
-            vocoder_config=vocoder_config_path,
-            use_cuda=False
-        )
+        self.synthesizer = Synthesizer(**model_files(base_dir), use_cuda=False)
+        self.sample_rate = self.synthesizer.output_sample_rate
+        self.voice = "ljspeech"
+        # Computed once here; part of every TTS cache key
+        self.model_version = model_fingerprint(base_dir)
         # warm up optionally (small phrase)
         try:
             self.synthesizer.tts("Initializing.")
@@ -0,0 +1,243 @@
+# asr_service.py
+"""
+Multi-stream ASR service.
+
+One loaded Vosk model (fetched through get_model, e.g. VOSK_MODEL.get) is
+shared by a pool of worker threads (Kaldi decodes outside the GIL); every
+stream gets its own KaldiRecognizer and VAD gate.
+A stream's chunks are decoded in order by at most one worker at a time, so
+many streams progress in parallel up to the pool size.
+
+Backpressure: each stream buffers at most `max_pending_seconds` of audio.
+feed() blocks (or raises ASRBusy with block=False) while the buffer is full,
+and open_stream() refuses new streams beyond `max_streams`. Streams that get
+no audio for `idle_timeout` seconds (clients that vanished without closing)
+are closed by a reaper thread so they don't hold a slot forever. stats()
+reports per-stream real-time factor (decode time / audio time) and queued audio.
+"""
+import os
+import json
+import time
+import uuid
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from vosk import KaldiRecognizer
+from FUNCTION.LISTEN.vad import VADGate
+
+SAMPLE_BYTES = 2
+
+
+class ASRBusy(RuntimeError):
+    """Raised when a stream's buffer is full or no more streams can be opened."""
+
+
+class ASRStreamClosed(ValueError):
+    """Raised when audio is fed to a stream that was closed (by the client or the idle reaper)."""
+
+
+class ASRStream:
+    def __init__(self, service, stream_id: str, grammar: str = None, vad: bool = True, on_result=None):
+        self.service = service
+        self.id = stream_id
+        self.on_result = on_result
+        self.sample_rate = service.sample_rate
+        model = service.get_model()
+        self.rec = KaldiRecognizer(model, self.sample_rate, grammar) if grammar \
+            else KaldiRecognizer(model, self.sample_rate)
+        self.vad = VADGate(self.sample_rate) if vad else None
+        self.results = collections.deque(maxlen=100)
+        self.partial = ""
+        self.closed = False
+        self._pending = collections.deque()
+        self._pending_bytes = 0
+        self._scheduled = False
+        self._finished = threading.Event()
+        self._cond = threading.Condition()
+        self.audio_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.opened_at = time.time()
+        self.last_activity = time.monotonic()
+
+    # -----------------------------
+    # Producer side
+    # -----------------------------
+    def feed(self, pcm: bytes, block: bool = True, timeout: float = None):
+        """
+        Queue 16-bit mono PCM for decoding. Raises ASRBusy if the buffer stays full,
+        ASRStreamClosed once the stream is closed.
+        """
+        limit = int(self.service.max_pending_seconds * self.sample_rate) * SAMPLE_BYTES
+        with self._cond:
+            self.last_activity = time.monotonic()
+            if not self._cond.wait_for(lambda: self.closed or self._pending_bytes < limit,
+                                       timeout=timeout if block else 0):
+                self.service._count("rejected_chunks")
+                raise ASRBusy(f"stream {self.id} is {self.pending_seconds:.1f}s behind")
+            if self.closed:
+                raise ASRStreamClosed(f"stream {self.id} is closed")
+            self._pending.append(pcm)
+            self._pending_bytes += len(pcm)
+            schedule = not self._scheduled
+            self._scheduled = True
+        if schedule:
+            self.service._executor.submit(self._drain)
+
+    def close(self, timeout: float = None) -> str:
+        """Stop accepting audio, wait for queued audio to decode, return the final text."""
+        with self._cond:
+            already, self.closed = self.closed, True
+            schedule = not already and not self._scheduled
+            if schedule:
+                self._scheduled = True
+            self._cond.notify_all()  # feeders waiting for buffer space see the close
+        if schedule:
+            self.service._executor.submit(self._drain)
+        self._finished.wait(timeout)
+        self.service._release(self)
+        return self.results[-1] if self.results else ""
+
+    # -----------------------------
+    # Worker side
+    # -----------------------------
+    def _drain(self):
+        while True:
+            with self._cond:
+                if not self._pending:
+                    self._scheduled = False
+                    if self.closed:
+                        break
+                    return
+                chunk = self._pending.popleft()
+                self._pending_bytes -= len(chunk)
+                self._cond.notify_all()
+            try:
+                self._decode(chunk)
+            except Exception as e:
+                print(f"[ASR Error] stream {self.id}: {e}")
+
+        # closed and drained
+        t0 = time.perf_counter()
+        text = json.loads(self.rec.FinalResult()).get("text", "").strip()
+        self.decode_seconds += time.perf_counter() - t0
+        self._emit(text)
+        self._finished.set()
+
+    def _decode(self, chunk: bytes):
+        self.audio_seconds += len(chunk) / (SAMPLE_BYTES * self.sample_rate)
+        speech, ended = self.vad.process(chunk) if self.vad else (chunk, False)
+        if not speech:
+            return
+        t0 = time.perf_counter()
+        final = self.rec.AcceptWaveform(speech)
+        if final or ended:
+            # after an endpoint FinalResult() is empty; only flush with it when Kaldi didn't endpoint
+            result = self.rec.Result() if final else self.rec.FinalResult()
+            self._emit(json.loads(result).get("text", "").strip())
+        else:
+            self.partial = json.loads(self.rec.PartialResult()).get("partial", "")
+        self.decode_seconds += time.perf_counter() - t0
+
+    def _emit(self, text: str):
+        self.partial = ""
+        if not text:
+            return
+        self.results.append(text)
+        if self.on_result:
+            try:
+                self.on_result(self.id, text)
+            except Exception as e:
+                print(f"[ASR Callback Error] {e}")
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    @property
+    def pending_seconds(self) -> float:
+        return self._pending_bytes / (SAMPLE_BYTES * self.sample_rate)
+
+    def stats(self) -> dict:
+        return {
+            "id": self.id,
+            "audio_seconds": round(self.audio_seconds, 2),
+            "decode_seconds": round(self.decode_seconds, 3),
+            "rtf": round(self.decode_seconds / self.audio_seconds, 4) if self.audio_seconds else None,
+            "pending_seconds": round(self.pending_seconds, 2),
+            "results": len(self.results),
+            "idle_seconds": round(time.monotonic() - self.last_activity, 1),
+            "closed": self.closed,
+        }
+
+
+class ASRService:
+    def __init__(self, get_model, sample_rate: int = 16000, workers: int = None, max_streams: int = 32,
+                 max_pending_seconds: float = 5.0, idle_timeout: float = 60.0):
+        self.get_model = get_model
+        self.sample_rate = sample_rate
+        self.workers = workers or os.cpu_count() or 2
+        self.max_streams = max_streams
+        self.max_pending_seconds = max_pending_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="asr")
+        self._streams = {}
+        self._lock = threading.Lock()
+        self._counters = {"opened": 0, "closed": 0, "reaped": 0, "rejected_streams": 0, "rejected_chunks": 0}
+        self.idle_timeout = idle_timeout
+        self._stop = threading.Event()
+        if idle_timeout:
+            threading.Thread(target=self._reaper, daemon=True, name="asr-reaper").start()
+
+    def open_stream(self, stream_id: str = None, grammar: str = None, vad: bool = True,
+                    on_result=None) -> ASRStream:
+        """New decoding stream; grammar is an optional Vosk phrase-list JSON string."""
+        with self._lock:
+            if len(self._streams) >= self.max_streams:
+                self._counters["rejected_streams"] += 1
+                raise ASRBusy(f"{len(self._streams)} streams already open")
+            stream_id = stream_id or uuid.uuid4().hex[:12]
+            if stream_id in self._streams:
+                raise ValueError(f"stream {stream_id} already open")
+            stream = ASRStream(self, stream_id, grammar=grammar, vad=vad, on_result=on_result)
+            self._streams[stream_id] = stream
+            self._counters["opened"] += 1
+        return stream
+
+    def get(self, stream_id: str) -> ASRStream:
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def _release(self, stream: ASRStream):
+        with self._lock:
+            if self._streams.pop(stream.id, None) is not None:
+                self._counters["closed"] += 1
+
+    def _reaper(self):
+        """Close streams that received no audio for idle_timeout seconds."""
+        while not self._stop.wait(max(self.idle_timeout / 4, 1.0)):
+            cutoff = time.monotonic() - self.idle_timeout
+            with self._lock:
+                idle = [s for s in self._streams.values() if s.last_activity < cutoff]
+            for stream in idle:
+                print(f"[ASR] closing idle stream {stream.id}")
+                self._count("reaped")
+                stream.close(timeout=0)  # frees the slot now; queued audio still finishes decoding
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            streams = list(self._streams.values())
+            counters = dict(self._counters)
+        per_stream = [s.stats() for s in streams]
+        return dict(counters, workers=self.workers, open_streams=len(streams),
+                    pending_seconds=round(sum(s["pending_seconds"] for s in per_stream), 2),
+                    # > 1.0 means open streams need more decode time than the pool has cores
+                    load=round(sum(s["rtf"] or 0.0 for s in per_stream) / self.workers, 3),
+                    streams=per_stream)
+
+    def shutdown(self):
+        self._stop.set()
+        for stream in list(self._streams.values()):
+            stream.close(timeout=5)
+        self._executor.shutdown(wait=False)
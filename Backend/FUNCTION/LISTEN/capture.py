@@ -0,0 +1,140 @@
+# capture.py
+"""
+Always-on microphone capture.
+
+One long-lived sd.RawInputStream writes int16 mono frames into a fixed-size
+ring buffer. Recognizers attach as readers with their own cursor instead of
+opening a stream per call, so there is no device-open latency per utterance
+and nothing spoken between two listen() calls is lost. A reader can start a
+little in the past (pre-roll) so the first syllable is not clipped.
+"""
+import threading
+from colorama import Fore
+
+SAMPLE_RATE = 16000
+SAMPLE_BYTES = 2          # int16 mono
+CALLBACK_FRAMES = 1600    # 100 ms per device callback
+BUFFER_SECONDS = 30
+
+
+class RingBuffer:
+    """Byte ring addressed by absolute stream position (total bytes ever written)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self.written = 0
+        self.cond = threading.Condition()
+
+    def write(self, data: bytes):
+        n = len(data)
+        if n > self.capacity:
+            data, n = data[-self.capacity:], self.capacity
+        with self.cond:
+            start = self.written % self.capacity
+            first = min(n, self.capacity - start)
+            self._buf[start:start + first] = data[:first]
+            if first < n:
+                self._buf[:n - first] = data[first:]
+            self.written += len(data)
+            self.cond.notify_all()
+
+    def oldest(self) -> int:
+        return max(0, self.written - self.capacity)
+
+    def read(self, pos: int, max_bytes: int):
+        """(data, new_pos, dropped) from absolute position pos; call with cond held."""
+        dropped = 0
+        if pos < self.oldest():
+            dropped = self.oldest() - pos
+            pos = self.oldest()
+        n = min(max_bytes, self.written - pos)
+        start = pos % self.capacity
+        first = min(n, self.capacity - start)
+        data = bytes(self._buf[start:start + first])
+        if first < n:
+            data += bytes(self._buf[:n - first])
+        return data, pos + n, dropped
+
+
+class CaptureReader:
+    def __init__(self, capture, pos: int):
+        self.capture = capture
+        self.pos = pos
+        self.dropped_bytes = 0
+
+    def read(self, frames: int, timeout: float = None):
+        """Block until `frames` frames are available; None on timeout or when capture stopped."""
+        ring = self.capture.ring
+        want = frames * SAMPLE_BYTES
+        with ring.cond:
+            ready = ring.cond.wait_for(
+                lambda: ring.written - max(self.pos, ring.oldest()) >= want or not self.capture.running,
+                timeout=timeout)
+            if not ready or not self.capture.running:
+                return None
+            data, self.pos, dropped = ring.read(self.pos, want)
+        self.dropped_bytes += dropped
+        return data
+
+    def skip_to_now(self, keep_seconds: float = 0.0):
+        """Discard buffered audio, keeping only the last keep_seconds (pre-roll)."""
+        ring = self.capture.ring
+        with ring.cond:
+            keep = int(keep_seconds * SAMPLE_RATE) * SAMPLE_BYTES
+            self.pos = max(ring.oldest(), ring.written - keep)
+
+
+class AudioCapture:
+    def __init__(self, sample_rate: int = SAMPLE_RATE, buffer_seconds: float = BUFFER_SECONDS):
+        self.sample_rate = sample_rate
+        self.ring = RingBuffer(int(buffer_seconds * sample_rate) * SAMPLE_BYTES)
+        self.running = False
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def _callback(self, indata, frames, time, status):
+        if status:
+            print(Fore.RED + f"Audio Device Error: {status}")
+        self.ring.write(bytes(indata))
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            import sounddevice as sd  # only the live microphone needs an audio device
+            self._stream = sd.RawInputStream(samplerate=self.sample_rate, blocksize=CALLBACK_FRAMES,
+                                             dtype='int16', channels=1, callback=self._callback)
+            self._stream.start()
+            self.running = True
+
+    def stop(self):
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        with self.ring.cond:
+            self.ring.cond.notify_all()
+
+    def attach(self, preroll_seconds: float = 0.0) -> CaptureReader:
+        """New reader positioned preroll_seconds before now (starts the stream if needed)."""
+        self.start()
+        reader = CaptureReader(self, self.ring.written)
+        reader.skip_to_now(preroll_seconds)
+        return reader
+
+
+_capture = None
+_capture_lock = threading.Lock()
+
+
+def get_capture() -> AudioCapture:
+    """Process-wide capture service (created on first use)."""
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            _capture = AudioCapture()
+        return _capture
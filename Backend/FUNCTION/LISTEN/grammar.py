@@ -0,0 +1,60 @@
+# grammar.py
+"""
+Vosk command grammar generated from the command catalog.
+
+Most utterances are catalog keywords, so decoding against a phrase list is
+much cheaper (and more accurate) than open-vocabulary decoding. The grammar
+also carries the DLG.py wake / bye phrases, and keyword + slot-value
+combinations for parameterized commands while that stays small.
+"""
+import re
+import json
+import threading
+from DATA.JARVIS_DLG_DATASET.DLG import wake_key_word, bye_key_word
+
+MAX_SLOT_COMBINATIONS = 5000   # skip keyword x slot-value expansion beyond this
+_CLEAN_RE = re.compile(r"[^a-z0-9' ]+")
+
+
+def clean_phrase(text: str) -> str:
+    """Lowercase and strip punctuation the way Vosk output looks."""
+    return " ".join(_CLEAN_RE.sub(" ", (text or "").lower()).split())
+
+
+class CommandGrammar:
+    def __init__(self, extra_phrases=(wake_key_word, bye_key_word)):
+        self.extra_phrases = [p for group in extra_phrases for p in group]
+        self._lock = threading.Lock()
+        self.phrases = []
+        self.json = None      # grammar string for KaldiRecognizer, None = free-form only
+        self.version = 0
+
+    def update(self, commands: dict, slot_values: dict = None):
+        """
+        Rebuild the grammar from the catalog.
+        slot_values: slot name -> spoken values (e.g. website names) for commands with "slots".
+        """
+        slot_values = slot_values or {}
+        phrases = []
+        for data in commands.values():
+            keywords = [clean_phrase(k) for k in data.get("keywords", [])]
+            phrases.extend(keywords)
+            for slot in data.get("slots", []):
+                values = [clean_phrase(v) for v in slot_values.get(slot, ())]
+                if len(keywords) * len(values) <= MAX_SLOT_COMBINATIONS:
+                    phrases.extend(f"{k} {v}" for k in keywords for v in values)
+        phrases.extend(clean_phrase(p) for p in self.extra_phrases)
+
+        phrases = [p for p in dict.fromkeys(phrases) if p]
+        grammar = json.dumps(phrases + ["[unk]"]) if phrases else None
+        with self._lock:
+            self.phrases = phrases
+            self.json = grammar
+            self.version += 1
+        return self.version
+
+    def follow(self, catalog, slot_values: dict = None):
+        """Build from a BRAIN.catalog.CommandCatalog now and rebuild on every catalog reload."""
+        self.update(catalog.commands, slot_values=slot_values)
+        catalog.on_reload(lambda matcher: self.update(matcher.commands, slot_values=slot_values))
+        return self.version
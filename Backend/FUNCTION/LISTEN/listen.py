@@ -1,157 +1,212 @@
 # listen.py
 import os
-import queue
 import json
 import time
-import sounddevice as sd
 from vosk import Model, KaldiRecognizer
 from colorama import Fore, Style, init as colorama_init
 from datetime import datetime
-
-# Optional: install webrtcvad for better VAD (voice activity detection)
-try:
-    import webrtcvad
-    VAD_AVAILABLE = True
-except Exception:
-    VAD_AVAILABLE = False
+from FUNCTION.LISTEN.grammar import CommandGrammar
+from DATA.JARVIS_DLG_DATASET.DLG import wake_key_word
+from FUNCTION.LISTEN.capture import get_capture
+from FUNCTION.LISTEN.sources import MICROPHONE
+from FUNCTION.LISTEN.vad import VADGate
+from FUNCTION.LISTEN.wakeword import WakeWordDetector
+from UTILS.speech_state import SPEECH_STATE
+from UTILS.model_loader import ModelLoader, ModelUnavailable
+from UTILS import config
 
 colorama_init(autoreset=True)
 
-MODEL_PATH = r"D:\JARVIS\DATA\Backend\LISTEN MODAL\Vosk Modal\vosk-model-small-en-us-0.15"
+MODEL_PATH = config.get("vosk_model_path")
 SAMPLE_RATE = 16000
 TIMEOUT_SEC = 10             # base timeout when waiting for audio blocks
 MAX_SILENCE_BLOCKS = 12      # how many consecutive empty reads before giving up
-BLOCKSIZE = 8000
+BLOCKSIZE = 4000             # frames handed to the recognizer per read (250 ms)
+PREROLL_SEC = 0.3            # audio kept from just before listen() starts
+NO_SPEECH_TIMEOUT_SEC = 10   # give up when the VAD hears no speech for this long
+
+def _load_vosk_model():
+    if not os.path.isdir(MODEL_PATH):
+        raise FileNotFoundError(f"Vosk model not found at: {MODEL_PATH}")
+    return Model(MODEL_PATH)
+
+# Loaded on a background thread (main.py starts it with the server); recognizers wait for it
+VOSK_MODEL = ModelLoader("Vosk", _load_vosk_model, MODEL_PATH)
+
+# Command mode: decode against the catalog grammar, fall back to free-form on low confidence.
+# Empty until a caller binds it to the catalog (COMMAND_GRAMMAR.follow(CATALOG), see main.py).
+COMMAND_MODE = True
+GRAMMAR_MIN_CONFIDENCE = 0.6
+COMMAND_GRAMMAR = CommandGrammar()
 
-if not os.path.isdir(MODEL_PATH):
-    raise FileNotFoundError(f"Vosk model not found at: {MODEL_PATH}")
-vosk_model = Model(MODEL_PATH)
+# Only speech segments (plus padding) reach Kaldi; VAD_GATE.stats() reports the audio skipped.
+VAD_GATE = VADGate(SAMPLE_RATE)
+
+# hearing() only runs this keyword spotter; full decoding starts after a trigger.
+WAKE_DETECTOR = WakeWordDetector(VOSK_MODEL.get, wake_key_word, SAMPLE_RATE)
 
 def now():
     return datetime.now().strftime("%H:%M:%S")
 
-def _is_speaking():
-    """Check speaking flag - simple IPC via env var.
-       Returns True while Jarvis is speaking (set by speak.py).
-    """
-    return os.environ.get("JARVIS_SPEAKING", "0") == "1"
-
-def listen():
+def _new_recognizer(command_mode: bool):
+    """(recognizer, uses_grammar). Grammar recognizers report per-word confidences."""
+    grammar = COMMAND_GRAMMAR.json if command_mode else None
+    if grammar:
+        rec = KaldiRecognizer(VOSK_MODEL.get(), SAMPLE_RATE, grammar)
+        rec.SetWords(True)
+        return rec, True
+    return KaldiRecognizer(VOSK_MODEL.get(), SAMPLE_RATE), False
+
+def _grammar_confident(result: dict) -> bool:
+    words = result.get("result") or []
+    if not words or "[unk]" in result.get("text", ""):
+        return False
+    return sum(w.get("conf", 0.0) for w in words) / len(words) >= GRAMMAR_MIN_CONFIDENCE
+
+def _decode_free_form(chunks) -> str:
+    """Re-decode a buffered utterance with the open-vocabulary recognizer."""
+    rec = KaldiRecognizer(VOSK_MODEL.get(), SAMPLE_RATE)
+    for chunk in chunks:
+        rec.AcceptWaveform(chunk)
+    return json.loads(rec.FinalResult()).get("text", "").strip()
+
+def listen(on_partial=None, command_mode=None, source=None, raise_errors=False):
     """
     Listen until speech recognized or timeout. Pauses automatically while Jarvis is speaking.
     Returns the recognized text (lowercased) or "" on timeout/error.
+    on_partial: optional callback(text) fed every new partial hypothesis (speculative resolution).
+    command_mode: decode with the catalog grammar first (default COMMAND_MODE).
+    source: FUNCTION.LISTEN.sources.AudioSource to read from (default the microphone);
+            recorded sources return "" once exhausted (check source.finished).
+    raise_errors: re-raise model / audio source errors instead of printing them and returning "".
     """
+    command_mode = COMMAND_MODE if command_mode is None else command_mode
+    source = source or MICROPHONE
     print(Fore.CYAN + f"[{now()}] Ready to listen. Speak into the microphone!")
-    q = queue.Queue()
-
-    def audio_callback(indata, frames, time, status):
-        if status:
-            print(Fore.RED + f"Audio Device Error: {status}")
-        q.put(bytes(indata))
 
     try:
-        with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=BLOCKSIZE,
-                               dtype='int16', channels=1, callback=audio_callback):
-            rec = KaldiRecognizer(vosk_model, SAMPLE_RATE)
-            if VAD_AVAILABLE:
-                vad = webrtcvad.Vad(1)  # aggressive=1
-            print(Fore.LIGHTGREEN_EX + "🟢 Listening... (Say something)")
-            print(Fore.YELLOW + "⬤", end="", flush=True)
-
-            silence_count = 0
-            partial_text = ""
-            last_audio_time = time.time()
-
-            while True:
-                # If Jarvis is speaking, pause listening until finished
-                if _is_speaking():
-                    print(Fore.MAGENTA + "\r[PAUSED] Jarvis is speaking — pausing listen...", end="", flush=True)
-                    # Drain the queue to avoid filling memory
-                    try:
-                        while not q.empty():
-                            q.get_nowait()
-                    except Exception:
-                        pass
-                    # Sleep briefly and continue checking the speaking flag
-                    time.sleep(0.1)
-                    continue
-
-                try:
-                    data = q.get(timeout=TIMEOUT_SEC)
-                    last_audio_time = time.time()
-                except queue.Empty:
-                    silence_count += 1
-                    if silence_count >= MAX_SILENCE_BLOCKS:
-                        print(Fore.RED + f"\n[{now()}] Timeout: No speech detected.")
-                        return ""
-                    continue
-
-                # Optional VAD check (if installed)
-                if VAD_AVAILABLE:
-                    try:
-                        is_speech = vad.is_speech(data, SAMPLE_RATE)
-                        if not is_speech:
-                            # not speech chunk — continue
-                            continue
-                    except Exception:
-                        pass
-
-                if rec.AcceptWaveform(data):
-                    result = json.loads(rec.Result())
-                    recognized_txt = result.get("text", "").strip()
-                    if recognized_txt:
-                        recognized_txt = recognized_txt.lower()
-                        print(Style.RESET_ALL + "\r" + Fore.BLUE + f"🔹 Mr Shivang: {recognized_txt}")
-                        return recognized_txt
-                    else:
-                        print(Style.RESET_ALL + "\r" + Fore.RED + f"[{now()}] Sorry, couldn't recognize.")
-                        return ""
-                else:
-                    partial = json.loads(rec.PartialResult()).get("partial", "")
-                    if partial and partial != partial_text:
-                        partial_text = partial
-                        print(Style.RESET_ALL + "\r" + Fore.LIGHTYELLOW_EX + f"[... ] {partial}" + " " * 30, end="", flush=True)
-
+        reader = source.open(preroll_seconds=PREROLL_SEC)
+        rec, uses_grammar = _new_recognizer(command_mode)
+        utterance_chunks = []  # audio of the current utterance, for the free-form fallback
+        VAD_GATE.reset()
+        print(Fore.LIGHTGREEN_EX + "🟢 Listening... (Say something)")
+        print(Fore.YELLOW + "⬤", end="", flush=True)
+
+        silence_count = 0
+        partial_text = ""
+        silent_audio = 0.0     # seconds of audio (not wall time) without speech
+        decoding = False
+
+        def finish(result):
+            recognized_txt = result.get("text", "").strip()
+            if uses_grammar and not _grammar_confident(result):
+                recognized_txt = _decode_free_form(utterance_chunks)
+            if recognized_txt:
+                recognized_txt = recognized_txt.lower()
+                print(Style.RESET_ALL + "\r" + Fore.BLUE + f"🔹 Mr Shivang: {recognized_txt}")
+                return recognized_txt
+            print(Style.RESET_ALL + "\r" + Fore.RED + f"[{now()}] Sorry, couldn't recognize.")
+            return ""
+
+        while True:
+            # If Jarvis is speaking, pause listening until finished
+            if source.live and SPEECH_STATE.speaking:
+                print(Fore.MAGENTA + "\r[PAUSED] Jarvis is speaking — pausing listen...", end="", flush=True)
+                SPEECH_STATE.wait_until_silent()
+                # Skip everything captured during playback (a pre-roll here would be Jarvis's own tail)
+                reader.skip_to_now(0)
+                VAD_GATE.reset()
+                silent_audio = 0.0
+
+            data = reader.read(BLOCKSIZE, timeout=TIMEOUT_SEC)
+            if data is None:
+                if not source.live:
+                    # end of the recording: flush whatever was being decoded
+                    return finish(json.loads(rec.FinalResult())) if decoding else ""
+                silence_count += 1
+                if silence_count >= MAX_SILENCE_BLOCKS or not get_capture().running:
+                    print(Fore.RED + f"\n[{now()}] Timeout: No speech detected.")
+                    return ""
+                continue
+
+            speech, segment_ended = VAD_GATE.process(data)
+            if VAD_GATE.in_speech or speech:
+                silent_audio = 0.0
+            else:
+                silent_audio += len(data) / (2 * SAMPLE_RATE)
+                if silent_audio > NO_SPEECH_TIMEOUT_SEC:
+                    print(Fore.RED + f"\n[{now()}] Timeout: No speech detected.")
+                    return ""
+            if not speech:
+                continue
+
+            if uses_grammar:
+                utterance_chunks.append(speech)
+            decoding = True
+            final = rec.AcceptWaveform(speech)
+            if final or segment_ended:
+                # The VAD closing a segment ends the utterance even if Kaldi has not endpointed yet
+                return finish(json.loads(rec.Result() if final else rec.FinalResult()))
+            else:
+                partial = json.loads(rec.PartialResult()).get("partial", "")
+                if partial and partial != partial_text:
+                    partial_text = partial
+                    print(Style.RESET_ALL + "\r" + Fore.LIGHTYELLOW_EX + f"[... ] {partial}" + " " * 30, end="", flush=True)
+                    if on_partial:
+                        try:
+                            on_partial(partial)
+                        except Exception as e:
+                            print(Fore.RED + f"\n[Partial Hook Error] {e}")
+
+    except ModelUnavailable as exc:
+        if raise_errors:
+            raise
+        print(Fore.RED + f"\n[{now()}] Speech recognition unavailable: {exc}")
+        return ""
     except Exception as exc:
+        if raise_errors:
+            raise
         print(Fore.RED + f"\n[{now()}] Audio Error: {exc}")
         return ""
 
 
-def hearing():
-    """Simpler wake-word wait — same speaking pause considered."""
+def hearing(timeout=None):
+    """
+    Wait for a wake phrase — same speaking pause considered.
+    Only the wake-word spotter runs here; returns the phrase heard, or "" after
+    `timeout` seconds (None waits indefinitely) or on error.
+    """
     print(Fore.CYAN + f"[{now()}] Waiting for wake word...")
-    q = queue.Queue()
-
-    def audio_callback(indata, frames, time, status):
-        if status:
-            print(Fore.RED + f"Audio Device Error: {status}")
-        q.put(bytes(indata))
+    deadline = time.time() + timeout if timeout else None
 
     try:
-        with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=BLOCKSIZE,
-                               dtype='int16', channels=1, callback=audio_callback):
-            rec = KaldiRecognizer(vosk_model, SAMPLE_RATE)
-            while True:
-                if _is_speaking():
-                    time.sleep(0.1)
-                    continue
-                try:
-                    data = q.get(timeout=TIMEOUT_SEC)
-                except queue.Empty:
-                    print(Fore.RED + f"\n[{now()}] Wake word timeout.")
+        reader = get_capture().attach(preroll_seconds=PREROLL_SEC)
+        WAKE_DETECTOR.start()
+        while True:
+            if SPEECH_STATE.speaking:
+                SPEECH_STATE.wait_until_silent()
+                reader.skip_to_now(0)
+                WAKE_DETECTOR.reset()
+            if deadline and time.time() > deadline:
+                print(Fore.RED + f"\n[{now()}] Wake word timeout.")
+                return ""
+            data = reader.read(BLOCKSIZE, timeout=TIMEOUT_SEC)
+            if data is None:
+                if not get_capture().running:
                     return ""
-                if rec.AcceptWaveform(data):
-                    result = json.loads(rec.Result())
-                    recognized_txt = result.get("text", "").strip()
-                    if recognized_txt:
-                        recognized_txt = recognized_txt.lower()
-                        print(Fore.CYAN + f"\n[{now()}] Wake Command Heard: {recognized_txt}")
-                        return recognized_txt
-                    else:
-                        continue
+                continue
+            phrase = WAKE_DETECTOR.feed(data)
+            if phrase:
+                print(Fore.CYAN + f"\n[{now()}] Wake Command Heard: {phrase}")
+                return phrase
+    except ModelUnavailable as exc:
+        print(Fore.RED + f"\n[{now()}] Speech recognition unavailable: {exc}")
+        return ""
     except Exception as exc:
         print(Fore.RED + f"\n[{now()}] Audio Error: {exc}")
         return ""
+    finally:
+        WAKE_DETECTOR.stop()
 
 
 # For demo / debug mode — normally your main.py will call listen()
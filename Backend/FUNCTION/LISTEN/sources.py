@@ -0,0 +1,180 @@
+# sources.py
+"""
+Audio sources for listen().
+
+Every source yields 16 kHz mono int16 PCM through a reader with the same
+read(frames, timeout) / skip_to_now(keep_seconds) interface as the capture
+ring buffer. The microphone is live; recorded sources (WAV file, WAV
+directory, raw PCM from stdin or a socket) replay as fast as the recognizer
+can take them unless realtime=True, which makes it possible to push hours of
+recorded traffic through ASR -> intent matching -> actions on a headless box.
+"""
+import os
+import sys
+import glob
+import time
+import wave
+import socket
+from abc import ABC, abstractmethod
+from FUNCTION.LISTEN.capture import get_capture
+
+SAMPLE_RATE = 16000
+SAMPLE_BYTES = 2
+READ_BYTES = 32000        # how much recorded audio to pull from a file/stream at a time
+
+
+class AudioSource(ABC):
+    """Base class: open() returns the reader listen() pulls audio from."""
+    live = True           # live sources pause while Jarvis speaks and never run out
+
+    @abstractmethod
+    def open(self, preroll_seconds: float = 0.0):
+        """Reader with read(frames, timeout) / skip_to_now(keep_seconds)."""
+
+    @property
+    def finished(self) -> bool:
+        return False
+
+
+class MicrophoneSource(AudioSource):
+    """The always-on capture service (FUNCTION/LISTEN/capture.py)."""
+
+    def open(self, preroll_seconds: float = 0.0):
+        return get_capture().attach(preroll_seconds)
+
+
+class RecordedReader:
+    """Reader over a chunk iterator; read() returns None once the recording is exhausted."""
+
+    def __init__(self, chunks, realtime: bool = False):
+        self._chunks = chunks
+        self._buf = b""
+        self.realtime = realtime
+        self.finished = False
+        self.bytes_read = 0
+        self.dropped_bytes = 0
+        self._started = None
+
+    def read(self, frames: int, timeout: float = None):
+        want = frames * SAMPLE_BYTES
+        while len(self._buf) < want and not self.finished:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.finished = True
+            else:
+                self._buf += chunk
+        if not self._buf:
+            return None
+        data, self._buf = self._buf[:want], self._buf[want:]
+        if len(data) % SAMPLE_BYTES:
+            data = data[:-(len(data) % SAMPLE_BYTES)]
+        self.bytes_read += len(data)
+        if self.realtime:
+            self._pace()
+        return data or None
+
+    def _pace(self):
+        if self._started is None:
+            self._started = time.perf_counter()
+        ahead = self.bytes_read / (SAMPLE_RATE * SAMPLE_BYTES) - (time.perf_counter() - self._started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+    def skip_to_now(self, keep_seconds: float = 0.0):
+        """Recorded audio has no 'now' to skip to; nothing is discarded."""
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.bytes_read / (SAMPLE_RATE * SAMPLE_BYTES)
+
+
+class RecordedSource(AudioSource):
+    """A recording consumed across successive listen() calls through one shared reader."""
+    live = False
+
+    def __init__(self, realtime: bool = False):
+        self.realtime = realtime
+        self.reader = None
+
+    @abstractmethod
+    def chunks(self):
+        """Iterator of raw 16 kHz mono int16 PCM byte chunks."""
+
+    def open(self, preroll_seconds: float = 0.0):
+        if self.reader is None:
+            self.reader = RecordedReader(self.chunks(), self.realtime)
+        return self.reader
+
+    @property
+    def finished(self) -> bool:
+        return self.reader is not None and self.reader.finished and not self.reader._buf
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.reader.audio_seconds if self.reader else 0.0
+
+
+def _wav_chunks(path: str, tail_silence: float):
+    with wave.open(path, "rb") as wf:
+        if (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) != (1, SAMPLE_BYTES, SAMPLE_RATE):
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM, got {wf.getframerate()} Hz, "
+                             f"{wf.getnchannels()} channel(s), {8 * wf.getsampwidth()}-bit")
+        while True:
+            data = wf.readframes(READ_BYTES // SAMPLE_BYTES)
+            if not data:
+                break
+            yield data
+    # trailing silence lets the VAD / recognizer endpoint the last utterance
+    if tail_silence:
+        yield b"\0" * (int(tail_silence * SAMPLE_RATE) * SAMPLE_BYTES)
+
+
+class WavFileSource(RecordedSource):
+    def __init__(self, path: str, realtime: bool = False, tail_silence: float = 1.0):
+        super().__init__(realtime)
+        self.path = path
+        self.tail_silence = tail_silence
+
+    def chunks(self):
+        return _wav_chunks(self.path, self.tail_silence)
+
+
+class WavDirectorySource(RecordedSource):
+    """Every *.wav under a directory, in name order, each followed by a short silence."""
+
+    def __init__(self, directory: str, realtime: bool = False, tail_silence: float = 1.0):
+        super().__init__(realtime)
+        self.paths = sorted(glob.glob(os.path.join(directory, "**", "*.wav"), recursive=True))
+        self.tail_silence = tail_silence
+        self.current = None   # file being replayed
+
+    def chunks(self):
+        for path in self.paths:
+            self.current = path
+            yield from _wav_chunks(path, self.tail_silence)
+
+
+class RawPCMSource(RecordedSource):
+    """Headerless 16 kHz mono int16 PCM from a binary stream (stdin, socket, pipe)."""
+
+    def __init__(self, stream, realtime: bool = False):
+        super().__init__(realtime)
+        self.stream = stream
+
+    @classmethod
+    def from_stdin(cls, realtime: bool = False):
+        return cls(sys.stdin.buffer, realtime)
+
+    @classmethod
+    def from_socket(cls, host: str, port: int, realtime: bool = False):
+        return cls(socket.create_connection((host, port)).makefile("rb"), realtime)
+
+    def chunks(self):
+        while True:
+            data = self.stream.read(READ_BYTES)
+            if not data:
+                return
+            yield data
+
+
+MICROPHONE = MicrophoneSource()
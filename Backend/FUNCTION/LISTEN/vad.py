@@ -0,0 +1,103 @@
+# vad.py
+"""
+Voice activity gate in front of the recognizer.
+
+webrtcvad only accepts 10/20/30 ms frames, so capture blocks are re-framed
+first. A segment opens once most frames in a short window are voiced (the
+window is emitted as leading padding) and closes after `hangover_ms` of
+continuous non-speech (emitted as trailing padding). Everything outside a
+segment is skipped, so Kaldi never decodes an idle room.
+"""
+import collections
+import threading
+
+# Optional: install webrtcvad for voice activity detection
+try:
+    import webrtcvad
+    VAD_AVAILABLE = True
+except Exception:
+    VAD_AVAILABLE = False
+
+SAMPLE_BYTES = 2  # int16 mono
+
+
+class VADGate:
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, aggressiveness: int = 1,
+                 padding_ms: int = 300, hangover_ms: int = 600, trigger_ratio: float = 0.6):
+        if frame_ms not in (10, 20, 30):
+            raise ValueError("webrtcvad frames must be 10, 20 or 30 ms")
+        self.sample_rate = sample_rate
+        self.frame_bytes = sample_rate * frame_ms // 1000 * SAMPLE_BYTES
+        self.padding_frames = max(1, padding_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.trigger_ratio = trigger_ratio
+        self.aggressiveness = aggressiveness
+        self.enabled = VAD_AVAILABLE
+        self._vad = webrtcvad.Vad(aggressiveness) if VAD_AVAILABLE else None
+        self._lock = threading.Lock()
+        self._totals = {"bytes_in": 0, "bytes_passed": 0, "segments": 0}
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance (cumulative stats are kept)."""
+        self._pending = b""
+        self._window = collections.deque(maxlen=self.padding_frames)  # (frame, voiced)
+        self._silent_run = 0
+        self.in_speech = False
+
+    def process(self, data: bytes):
+        """
+        Feed captured audio. Returns (speech, ended): the bytes to pass to the
+        recognizer (possibly b"") and whether a speech segment just closed.
+        Without webrtcvad everything is passed through and segments never close.
+        """
+        if not self.enabled:
+            self._count(len(data), len(data), False)
+            return data, False
+
+        buf = self._pending + data
+        usable = len(buf) - len(buf) % self.frame_bytes
+        self._pending = buf[usable:]
+        out = []
+        ended = False
+        for i in range(0, usable, self.frame_bytes):
+            frame = buf[i:i + self.frame_bytes]
+            voiced = self._vad.is_speech(frame, self.sample_rate)
+            if not self.in_speech:
+                self._window.append((frame, voiced))
+                if sum(v for _, v in self._window) >= self.trigger_ratio * self._window.maxlen:
+                    self.in_speech = True
+                    self._silent_run = 0
+                    out.extend(f for f, _ in self._window)
+                    self._window.clear()
+            else:
+                out.append(frame)
+                self._silent_run = 0 if voiced else self._silent_run + 1
+                if self._silent_run >= self.hangover_frames:
+                    self.in_speech = False
+                    ended = True
+                    break
+
+        if ended:
+            # Anything after the segment belongs to the next utterance; start over there.
+            rest = buf[i + self.frame_bytes:usable] + self._pending
+            self.reset()
+            self._pending = rest
+        speech = b"".join(out)
+        self._count(len(data), len(speech), ended)
+        return speech, ended
+
+    def _count(self, n_in: int, n_out: int, ended: bool):
+        with self._lock:
+            self._totals["bytes_in"] += n_in
+            self._totals["bytes_passed"] += n_out
+            self._totals["segments"] += ended
+
+    def stats(self) -> dict:
+        with self._lock:
+            totals = dict(self._totals)
+        bytes_in = totals["bytes_in"]
+        totals["audio_seconds"] = round(bytes_in / (self.sample_rate * SAMPLE_BYTES), 1)
+        totals["skipped_fraction"] = round(1 - totals["bytes_passed"] / bytes_in, 3) if bytes_in else 0.0
+        totals["enabled"] = self.enabled
+        return totals
@@ -0,0 +1,124 @@
+# wakeword.py
+"""
+Wake-word spotting front-end for hearing().
+
+Cascade, cheapest first:
+  1. energy floor  - blocks quieter than ENERGY_FLOOR never reach the VAD
+  2. VAD gate      - only speech segments (plus padding) go further
+  3. keyword spotter - a Vosk recognizer constrained to the DLG.py
+     wake_key_word phrases + [unk], far cheaper than open-vocabulary decoding
+
+Full decoding (listen()) only starts after a trigger. stats() reports the
+CPU this stage burns per wall-clock second and onset-to-trigger latency.
+"""
+import json
+import time
+import threading
+import numpy as np
+from vosk import KaldiRecognizer
+from FUNCTION.LISTEN.grammar import clean_phrase
+from FUNCTION.LISTEN.vad import VADGate
+
+ENERGY_FLOOR = 300          # int16 RMS below which a block is treated as silence
+MIN_CONFIDENCE = 0.7        # mean word confidence over the matched wake phrase
+
+
+class WakeWordDetector:
+    def __init__(self, get_model, phrases, sample_rate: int = 16000, energy_floor: int = ENERGY_FLOOR,
+                 min_confidence: float = MIN_CONFIDENCE):
+        self.get_model = get_model   # e.g. VOSK_MODEL.get, so the model can still be loading
+        self.sample_rate = sample_rate
+        self.energy_floor = energy_floor
+        self.min_confidence = min_confidence
+        self.phrases = sorted({clean_phrase(p) for p in phrases if clean_phrase(p)}, key=len, reverse=True)
+        self.grammar = json.dumps(self.phrases + ["[unk]"])
+        self.gate = VADGate(sample_rate)
+        self._lock = threading.Lock()
+        self._stats = {"triggers": 0, "rejected": 0, "blocks": 0, "energy_skipped": 0,
+                       "decoded_seconds": 0.0, "cpu_seconds": 0.0, "wall_seconds": 0.0,
+                       "latency_ms_total": 0.0, "last_latency_ms": None}
+        self._rec = None
+        self._started = None
+        self._onset = None
+
+    def reset(self):
+        """Start (or restart after a pause) waiting for the wake phrase."""
+        self._rec = KaldiRecognizer(self.get_model(), self.sample_rate, self.grammar)
+        self._rec.SetWords(True)
+        self.gate.reset()
+        self._onset = None
+
+    def start(self):
+        self.reset()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        if self._started is not None:
+            with self._lock:
+                self._stats["wall_seconds"] += time.perf_counter() - self._started
+            self._started = None
+
+    def feed(self, data: bytes):
+        """Feed captured audio; returns the wake phrase heard, or None."""
+        cpu0 = time.thread_time()
+        try:
+            return self._feed(data)
+        finally:
+            with self._lock:
+                self._stats["cpu_seconds"] += time.thread_time() - cpu0
+
+    def _feed(self, data: bytes):
+        self._stats["blocks"] += 1
+        if not self.gate.in_speech:
+            samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+            if samples.size and np.sqrt(np.mean(samples * samples)) < self.energy_floor:
+                self._stats["energy_skipped"] += 1
+                return None
+
+        speech, segment_ended = self.gate.process(data)
+        if not speech:
+            return None
+        if self._onset is None:
+            self._onset = time.perf_counter()
+        self._stats["decoded_seconds"] += len(speech) / (2 * self.sample_rate)
+
+        final = self._rec.AcceptWaveform(speech)
+        if not (final or segment_ended):
+            return None
+        result = json.loads(self._rec.Result() if final else self._rec.FinalResult())
+        phrase = self._spotted(result)
+        onset, self._onset = self._onset, None
+        if phrase is None:
+            self._stats["rejected"] += bool(result.get("text"))
+            return None
+
+        latency_ms = (time.perf_counter() - onset) * 1000
+        with self._lock:
+            self._stats["triggers"] += 1
+            self._stats["latency_ms_total"] += latency_ms
+            self._stats["last_latency_ms"] = round(latency_ms, 1)
+        return phrase
+
+    def _spotted(self, result: dict):
+        words = [w for w in result.get("result") or [] if w.get("word") != "[unk]"]
+        heard = " ".join(w["word"] for w in words)
+        for phrase in self.phrases:
+            n = len(phrase.split())
+            tokens = heard.split()
+            for i in range(len(tokens) - n + 1):
+                if " ".join(tokens[i:i + n]) == phrase:
+                    conf = sum(w.get("conf", 0.0) for w in words[i:i + n]) / n
+                    if conf >= self.min_confidence:
+                        return phrase
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        wall = s["wall_seconds"] + (time.perf_counter() - self._started if self._started else 0.0)
+        s["cpu_percent"] = round(100 * s["cpu_seconds"] / wall, 2) if wall else 0.0
+        s["avg_latency_ms"] = round(s.pop("latency_ms_total") / s["triggers"], 1) if s["triggers"] else None
+        s["decoded_seconds"] = round(s["decoded_seconds"], 1)
+        s["cpu_seconds"] = round(s["cpu_seconds"], 3)
+        s["wall_seconds"] = round(wall, 1)
+        return s
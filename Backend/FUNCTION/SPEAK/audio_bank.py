@@ -0,0 +1,190 @@
+# audio_bank.py
+"""
+Pre-rendered speech for the fixed phrases Jarvis says.
+
+Every dialogue line in DATA/JARVIS_DLG_DATASET/DLG.py and every fixed
+`response` in commands.json is synthesized once, offline, and packed into
+
+    audio_bank.pcm  : magic b"JPCM" | format version (u32) | build id (16s), then
+                      the int16 PCM of every phrase back to back
+    audio_bank.json : {"build_id", "model_version", "norm_version",
+                       "entries": {cache key: [byte offset, samples, sample rate]}}
+
+Keys are the speaker's own cache keys (speech_text.cache_key), so a bank built
+with another model or normalizer simply never hits. At runtime the PCM file
+is memory-mapped and each phrase is a zero-copy int16 view into the mapping.
+
+Usage (from the Backend directory, with Jarvis stopped so the bank isn't mapped):
+    python -m FUNCTION.SPEAK.audio_bank [audio_bank.pcm]
+"""
+import os
+import sys
+import mmap
+import json
+import uuid
+import struct
+import threading
+import numpy as np
+from FUNCTION.SPEAK.speech_text import speech_units, normalize_for_tts, cache_key, to_pcm16, TEXT_NORM_VERSION
+
+DEFAULT_BANK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs", "audio_bank.pcm")
+
+MAGIC = b"JPCM"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sI16s")
+
+# DLG.py lists that hold what the user says (keywords), not what Jarvis says
+INPUT_LISTS = {"wake_key_word", "bye_key_word", "cmd1", "stopcmd", "open_input", "close_input", "x", "x1", "x2"}
+
+
+def index_path_for(pcm_path: str) -> str:
+    return os.path.splitext(pcm_path)[0] + ".json"
+
+
+def collect_phrases(commands_path: str = None) -> list:
+    """Distinct fixed phrases: DLG.py response lists + commands.json responses without {slot} placeholders."""
+    from DATA.JARVIS_DLG_DATASET import DLG
+    phrases = []
+    for name, value in vars(DLG).items():
+        if name.startswith("_") or name in INPUT_LISTS or not isinstance(value, (list, tuple)):
+            continue
+        phrases.extend(v for v in value if isinstance(v, str))
+    if commands_path:
+        with open(commands_path, "r", encoding="utf-8") as f:
+            for entry in json.load(f).values():
+                response = entry.get("response")
+                if isinstance(response, str) and "{" not in response:
+                    phrases.append(response)
+    return list(dict.fromkeys(p.strip() for p in phrases if p.strip()))
+
+
+class AudioBank:
+    def __init__(self, pcm_path: str, index_path: str = None):
+        self.pcm_path = pcm_path
+        self.index_path = index_path or index_path_for(pcm_path)
+        self.model_version = None
+        self._entries = {}
+        self._mm = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def load(self) -> bool:
+        """Map the bank; False (and an empty bank) if it is missing, torn or unreadable."""
+        if not (os.path.exists(self.pcm_path) and os.path.exists(self.index_path)):
+            return False
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            with open(self.pcm_path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, build_id = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != FORMAT_VERSION or build_id.hex() != index.get("build_id"):
+                mm.close()
+                print(f"⚠️ Audio bank {self.pcm_path} does not match its index; rebuild it.")
+                return False
+        except (OSError, ValueError, struct.error) as e:
+            print(f"⚠️ Audio bank unusable: {e}")
+            return False
+        self.close()
+        self._entries = {key: tuple(v) for key, v in index["entries"].items()}
+        self.model_version = index.get("model_version")
+        self._mm = mm
+        return True
+
+    def get(self, key: str):
+        """(read-only int16 view, sample rate) straight from the mapping, or None."""
+        entry = self._entries.get(key)
+        with self._lock:
+            self._stats["hits" if entry else "misses"] += 1
+        if entry is None:
+            return None
+        offset, samples, sample_rate = entry
+        return np.frombuffer(self._mm, dtype=np.int16, count=samples, offset=offset), sample_rate
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def close(self):
+        self._entries = {}
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # views are still playing; the mapping goes away with them
+            self._mm = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        bytes_ = sum(n * 2 for _, n, _ in self._entries.values())
+        return dict(s, entries=len(self._entries), bytes=bytes_, model_version=self.model_version)
+
+
+def write_bank(pcm_path: str, items, model_version: str, norm_version: int) -> int:
+    """Pack (key, int16 samples, sample rate) items into pcm_path + its index; returns the entry count."""
+    build_id = uuid.uuid4().bytes
+    entries = {}
+    tmp_pcm, tmp_index = pcm_path + ".tmp", index_path_for(pcm_path) + ".tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(pcm_path)), exist_ok=True)
+    with open(tmp_pcm, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, build_id))
+        offset = _HEADER.size
+        for key, pcm, sample_rate in items:
+            if key in entries:
+                continue
+            data = np.asarray(pcm, dtype=np.int16).tobytes()
+            f.write(data)
+            entries[key] = [offset, len(data) // 2, int(sample_rate)]
+            offset += len(data)
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump({"build_id": build_id.hex(), "model_version": model_version,
+                   "norm_version": norm_version, "entries": entries}, f)
+    # the build ids tie the pair together, so a reader between the two renames sees a mismatch, not a torn bank
+    os.replace(tmp_pcm, pcm_path)
+    os.replace(tmp_index, index_path_for(pcm_path))
+    return len(entries)
+
+
+def build(pcm_path: str, commands_path: str) -> int:
+    """Synthesize every fixed phrase into the bank; entries of the previous bank with the same key are reused."""
+    from BRAIN.tts_engine import TTSEngine
+    from UTILS import config
+
+    # nothing here may import FUNCTION.SPEAK.speak: it maps (and on Windows locks) the bank being replaced
+    engine = TTSEngine(config.get("tts_model_dir"))
+    previous = AudioBank(pcm_path)
+    previous.load()
+
+    units = list(dict.fromkeys(normalize_for_tts(u) for p in collect_phrases(commands_path)
+                               for u in speech_units(p)))
+    stats = {"reused": 0, "synthesized": 0, "failed": 0}
+
+    def items():
+        for i, text in enumerate(units, 1):
+            key = cache_key(text, engine.model_version)
+            audio = previous.get(key)
+            if audio is not None:
+                pcm, sample_rate = np.array(audio[0]), audio[1]
+                del audio  # no views may outlive the old mapping
+                stats["reused"] += 1
+                yield key, pcm, sample_rate
+                continue
+            wav = engine.synthesize(text)
+            if wav is None:
+                stats["failed"] += 1
+                continue
+            stats["synthesized"] += 1
+            print(f"[{i}/{len(units)}] {text}")
+            yield key, to_pcm16(wav), engine.sample_rate
+        previous.close()  # unmap before the new files replace it (Windows refuses to replace mapped files)
+
+    count = write_bank(pcm_path, items(), engine.model_version, TEXT_NORM_VERSION)
+    print(f"✅ Audio bank: {count} phrases ({stats['synthesized']} synthesized, {stats['reused']} reused,"
+          f" {stats['failed']} empty) -> {pcm_path}")
+    return count
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    build(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_BANK_PATH,
+          os.path.join(base_dir, "DATA", "COMMANDS", "commands.json"))
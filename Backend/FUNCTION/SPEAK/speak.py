@@ -1,21 +1,130 @@
 import os
 import time
+import wave
 import threading
-import hashlib
+import collections
+import numpy as np
 import simpleaudio as sa
-from queue import Queue
-from BRAIN.tts_engine import TTSEngine
+from queue import Queue, Empty
+from BRAIN.tts_engine import TTSEngine, model_fingerprint
+from FUNCTION.SPEAK.stream_player import StreamPlayer
+from FUNCTION.SPEAK.tts_cache import TTSCache
+from FUNCTION.SPEAK.audio_bank import AudioBank, DEFAULT_BANK_PATH
+from FUNCTION.SPEAK.speech_text import speech_units, normalize_for_tts, cache_key, to_pcm16
+from UTILS.speech_state import SPEECH_STATE
+from UTILS.model_loader import ModelLoader, ModelUnavailable
+from UTILS import config
 
 # -----------------------------
 # Global State and Cache
 # -----------------------------
-_AUDIO_CACHE = {}
+_PCM_CACHE = collections.OrderedDict()   # key -> (int16 samples, sample rate), LRU
+_pcm_cache_bytes = 0
 _CACHE_LOCK = threading.Lock()
+_SYNTH_LOCK = threading.Lock()  # one synthesis at a time (worker + prewarm threads)
 _speech_queue = Queue()
 _stop_signal = threading.Event()
 
-def _set_speaking_flag(val: bool):
-    os.environ["JARVIS_SPEAKING"] = "1" if val else "0"
+# TTS model loads in the background; synthesis waits for it
+TTS_MODEL = ModelLoader("TTS", lambda: TTSEngine(config.get("tts_model_dir")), config.get("tts_model_dir"))
+
+# Streaming: multi-sentence text is synthesized chunk by chunk while earlier chunks play
+# (splitting, normalization and cache keys live in speech_text, shared with the audio bank builder)
+STREAMING = True
+
+# Playback comes straight from memory; WAV files are written in the background for the disk cache
+PCM_CACHE_BYTES = 64 * 1024 * 1024
+WRITE_TO_DISK = True
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs")
+_disk_queue = Queue()
+ACCESS_FLUSH_SECONDS = 5.0   # how long the disk writer idles before writing batched cache hits to the index
+
+# Durable index of the WAV files (survives restarts, LRU-evicted under a byte budget)
+TTS_CACHE = TTSCache(OUTPUT_DIR, max_bytes=int(float(config.get("tts_cache_mb")) * 1024 * 1024))
+
+# Fixed dialogue lines pre-rendered offline (python -m FUNCTION.SPEAK.audio_bank), served from a memory map
+BANK_PATH = DEFAULT_BANK_PATH
+AUDIO_BANK = AudioBank(BANK_PATH)
+AUDIO_BANK.load()
+
+_METRICS = {"utterances": 0, "streamed": 0, "chunks": 0, "underruns": 0,
+            "ttfa_ms_last": None, "ttfa_ms_total": 0.0, "ttfa_count": 0}
+_METRICS_LOCK = threading.Lock()
+
+
+def _read_wav(path: str):
+    with wave.open(path, "rb") as wf:
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16), wf.getframerate()
+
+
+def _write_wav(path: str, pcm: np.ndarray, sample_rate: int):
+    tmp = path + ".part"
+    with wave.open(tmp, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
+    os.replace(tmp, path)
+
+
+def _disk_writer():
+    """Persist synthesized audio off the playback path; batched disk cache hits are indexed here too."""
+    while True:
+        try:
+            key, pcm, sample_rate, voice, model_version = _disk_queue.get(timeout=ACCESS_FLUSH_SECONDS)
+        except Empty:
+            try:
+                TTS_CACHE.flush_access()
+            except Exception as e:
+                print(f"⚠️ Could not update TTS cache index: {e}")
+            continue
+        try:
+            path = TTS_CACHE.path_for(key)
+            _write_wav(path, pcm, sample_rate)
+            TTS_CACHE.add(key, path, voice=voice, model_version=model_version)
+        except Exception as e:
+            print(f"⚠️ Could not write TTS cache file: {e}")
+        finally:
+            _disk_queue.task_done()
+
+
+_file_fingerprint = None
+
+
+def _fingerprint():
+    """TTS checkpoint fingerprint: the loaded engine's, or hashed from the files so cache hits don't wait for loading."""
+    global _file_fingerprint
+    if TTS_MODEL.ready:
+        return TTS_MODEL.get().model_version
+    if _file_fingerprint is None:
+        try:
+            _file_fingerprint = model_fingerprint(config.get("tts_model_dir"))
+        except OSError:
+            return None  # model files missing; synthesis will report it
+    return _file_fingerprint
+
+
+def _remember_pcm(key: str, audio):
+    global _pcm_cache_bytes
+    with _CACHE_LOCK:
+        if key in _PCM_CACHE:
+            _PCM_CACHE.move_to_end(key)
+            return
+        _PCM_CACHE[key] = audio
+        _pcm_cache_bytes += audio[0].nbytes
+        while _pcm_cache_bytes > PCM_CACHE_BYTES and len(_PCM_CACHE) > 1:
+            _, (old, _) = _PCM_CACHE.popitem(last=False)
+            _pcm_cache_bytes -= old.nbytes
+
+
+def _record_ttfa(queued_at: float, first_audio_at: float):
+    if first_audio_at is None:
+        return
+    ttfa_ms = (first_audio_at - queued_at) * 1000
+    with _METRICS_LOCK:
+        _METRICS["ttfa_ms_last"] = round(ttfa_ms, 1)
+        _METRICS["ttfa_ms_total"] += ttfa_ms
+        _METRICS["ttfa_count"] += 1
 
 
 # -----------------------------
@@ -35,8 +144,9 @@ class JarvisSpeaker:
             return
         self._initialized = True
 
-        # Initialize TTS engine once
-        self.engine = TTSEngine()
+        # Load the TTS engine once, off the caller's thread
+        TTS_MODEL.start()
+        threading.Thread(target=_disk_writer, daemon=True).start()
 
         # Start a single worker thread to handle queued speech
         self.worker_thread = threading.Thread(target=self._worker, daemon=True)
@@ -45,8 +155,11 @@ class JarvisSpeaker:
     # -----------------------------
     # Public Methods
     # -----------------------------
-    def speak(self, text="Hello", interrupt=False):
-        """Queue text for speech. If interrupt=True, clear queue and stop ongoing playback."""
+    def speak(self, text="Hello", interrupt=False, **synth_kwargs):
+        """
+        Queue text for speech. If interrupt=True, clear queue and stop ongoing playback.
+        synth_kwargs (speed, speaker_name, ...) are passed to TTSEngine.synthesize and are part of the cache key.
+        """
         if not text.strip():
             return
         if interrupt:
@@ -54,41 +167,131 @@ class JarvisSpeaker:
             with _speech_queue.mutex:
                 _speech_queue.queue.clear()
             _stop_signal.clear()
-        _speech_queue.put(text)
+        _speech_queue.put((text, time.perf_counter(), synth_kwargs))
+
+    def prewarm(self, text: str, **synth_kwargs):
+        """Synthesize text into the cache in the background without playing it."""
+        if not text or not text.strip():
+            return
+        chunks = speech_units(text, STREAMING)
+
+        def warm():
+            for chunk in chunks:
+                self._audio(chunk, synth_kwargs)
+        threading.Thread(target=warm, daemon=True).start()
 
     def stop(self):
         """Immediately stop ongoing playback."""
         _stop_signal.set()
 
+    @property
+    def engine(self):
+        return TTS_MODEL.get()
+
+    def stats(self) -> dict:
+        """Utterance / chunk counts, playback underruns, time-to-first-audio (queue -> device), bank and disk cache stats."""
+        with _METRICS_LOCK:
+            m = dict(_METRICS)
+        count = m.pop("ttfa_count")
+        total = m.pop("ttfa_ms_total")
+        m["ttfa_ms_avg"] = round(total / count, 1) if count else None
+        m["audio_bank"] = AUDIO_BANK.stats()
+        m["disk_cache"] = TTS_CACHE.stats()
+        return m
+
     # -----------------------------
     # Internal Helpers
     # -----------------------------
-    def _get_cached_wav(self, text: str):
-        """Generate or retrieve cached WAV file for given text."""
-        key = hashlib.md5(text.encode("utf-8")).hexdigest()
+    def _audio(self, text: str, synth_kwargs: dict = None):
+        """(int16 samples, sample rate) for text: audio bank, memory cache, disk cache, then synthesis."""
+        synth_kwargs = synth_kwargs or {}
+        text = normalize_for_tts(text)
+        fingerprint = _fingerprint()
+        key = cache_key(text, fingerprint, synth_kwargs)
+        audio = AUDIO_BANK.get(key)
+        if audio is not None:
+            return audio
+        audio = self._cached_audio(key, fingerprint)
+        if audio is not None:
+            return audio
 
-        with _CACHE_LOCK:
-            if key in _AUDIO_CACHE and os.path.exists(_AUDIO_CACHE[key]):
-                return _AUDIO_CACHE[key]
+        with _SYNTH_LOCK:
+            # a prewarm may have produced it while we waited
+            audio = self._cached_audio(key, fingerprint, disk=False)
+            if audio is not None:
+                return audio
 
-        # Generate new TTS output
-        wav = self.engine.synthesize(text)
-        if wav is None:
-            return None
+            # Generate new TTS output
+            try:
+                engine = self.engine
+                wav = engine.synthesize(text, **synth_kwargs)
+            except ModelUnavailable as e:
+                print(f"⚠️ {e}")
+                return None
+            if wav is None:
+                return None
 
-        os.makedirs("FUNCTION/SPEAK/outputs", exist_ok=True)
-        path = os.path.join("FUNCTION", "SPEAK", "outputs", f"tts_{key}.wav")
+            if engine.model_version != fingerprint:
+                # checkpoints were hashed before load and changed since; key on what actually synthesized
+                key = cache_key(text, engine.model_version, synth_kwargs)
+            audio = (to_pcm16(wav), engine.sample_rate)
+            _remember_pcm(key, audio)
+            if WRITE_TO_DISK:
+                voice = synth_kwargs.get("speaker_name") or engine.voice
+                _disk_queue.put((key, audio[0], audio[1], voice, engine.model_version))
+            return audio
 
-        self.engine.save(wav, path)
+    def _cached_audio(self, key: str, fingerprint: str = None, disk: bool = True):
         with _CACHE_LOCK:
-            _AUDIO_CACHE[key] = path
-        return path
+            audio = _PCM_CACHE.get(key)
+        if audio is not None:
+            _remember_pcm(key, audio)  # refresh LRU position
+            return audio
+        path = TTS_CACHE.get(key, model_version=fingerprint) if disk else None
+        if path:
+            audio = _read_wav(path)
+            _remember_pcm(key, audio)
+            return audio
+        return None
+
+    def _speak_streaming(self, chunks, queued_at: float, synth_kwargs: dict = None):
+        """Synthesize chunk N+1 while chunk N plays, all through one output stream."""
+        player = None
+        try:
+            for chunk in chunks:
+                if _stop_signal.is_set():
+                    break
+                audio = self._audio(chunk, synth_kwargs)
+                if audio is None:
+                    continue
+                if player is None:
+                    # speaking from the first audible chunk, not while the model loads or synthesizes it
+                    SPEECH_STATE.set_speaking(True)
+                    player = StreamPlayer(audio[1])
+                player.write(audio[0])
+            if player:
+                player.finish()
+                player.wait(_stop_signal)
+        except Exception as e:
+            print(f"❌ Playback error: {e}")
+            if player:
+                player.close()
+        finally:
+            SPEECH_STATE.set_speaking(False)
+        if player:
+            _record_ttfa(queued_at, player.first_audio_at)
+        with _METRICS_LOCK:
+            _METRICS["streamed"] += 1
+            _METRICS["chunks"] += len(chunks)
+            _METRICS["underruns"] += player.underruns if player else 0
 
-    def _play_wav(self, wav_path):
-        """Play a WAV file and monitor stop signal."""
+    def _play_pcm(self, pcm: np.ndarray, sample_rate: int, queued_at: float = None):
+        """Play int16 samples straight from memory and monitor stop signal."""
+        SPEECH_STATE.set_speaking(True)
         try:
-            wave_obj = sa.WaveObject.from_wave_file(wav_path)
-            play_obj = wave_obj.play()
+            play_obj = sa.play_buffer(pcm, 1, 2, sample_rate)
+            if queued_at is not None:
+                _record_ttfa(queued_at, time.perf_counter())
             while play_obj.is_playing():
                 if _stop_signal.is_set():
                     play_obj.stop()
@@ -96,23 +299,29 @@ class JarvisSpeaker:
                 time.sleep(0.05)
         except Exception as e:
             print(f"❌ Playback error: {e}")
+        finally:
+            SPEECH_STATE.set_speaking(False)
 
     def _worker(self):
         """Continuously process the speech queue sequentially."""
         while True:
-            text = _speech_queue.get()
+            text, queued_at, synth_kwargs = _speech_queue.get()
             if not text:
                 continue
 
-            _set_speaking_flag(True)
             try:
-                wav_path = self._get_cached_wav(text)
-                if wav_path:
-                    self._play_wav(wav_path)
+                with _METRICS_LOCK:
+                    _METRICS["utterances"] += 1
+                chunks = speech_units(text, STREAMING)
+                if len(chunks) > 1:
+                    self._speak_streaming(chunks, queued_at, synth_kwargs)
                 else:
-                    print("⚠️ TTS produced no audio.")
+                    audio = self._audio(text, synth_kwargs)
+                    if audio is not None:
+                        self._play_pcm(audio[0], audio[1], queued_at)
+                    else:
+                        print("⚠️ TTS produced no audio.")
             finally:
-                _set_speaking_flag(False)
                 _speech_queue.task_done()
 
 
@@ -122,9 +331,6 @@ class JarvisSpeaker:
 if __name__ == "__main__":
     speaker = JarvisSpeaker()
 
-    def is_speaking():
-        return os.environ.get("JARVIS_SPEAKING") == "1"
-
     while True:
         # Queue both messages (no interrupt to keep sequence intact)
         speaker.speak("Hello, I am your assistant. This is a test.")
@@ -132,8 +338,8 @@ if __name__ == "__main__":
         speaker.speak("Second line after first.")
 
         # Wait until speaking is done
-        while is_speaking():
-            time.sleep(0.1)
+        _speech_queue.join()
+        SPEECH_STATE.wait_until_silent()
 
         print("🟢 Cycle complete, repeating...\n")
         time.sleep(2)
@@ -0,0 +1,78 @@
+# speech_text.py
+"""
+Text preparation and cache keys for synthesized speech.
+
+Shared by the speaker (speak.py) and the offline audio bank builder
+(audio_bank.py), so both split, normalize and key phrases identically.
+Pure functions only: importing this module loads no model, opens no cache
+and maps no files.
+"""
+import re
+import json
+import hashlib
+import numpy as np
+
+STREAM_CHUNK_CHARS = 120
+MIN_CHUNK_CHARS = 40        # a shorter sentence stays with the previous one (no prosody break)
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+_ABBREVIATION_RE = re.compile(r"\b(?:mr|mrs|ms|dr|prof|sr|jr|st|vs|etc|e\.g|i\.e|no|approx)\.$", re.IGNORECASE)
+
+# Bump when normalize_for_tts() changes what reaches the synthesizer
+TEXT_NORM_VERSION = 1
+
+
+def _sentences(text: str, max_chars: int):
+    """Sentence pieces, re-joined after abbreviations ("Mr.") and when the next piece is short."""
+    sentences = []
+    for piece in _SENTENCE_RE.split(text.strip()):
+        if sentences and (_ABBREVIATION_RE.search(sentences[-1])
+                          or (len(piece) < MIN_CHUNK_CHARS and len(sentences[-1]) + 1 + len(piece) <= max_chars)):
+            sentences[-1] = f"{sentences[-1]} {piece}"
+        else:
+            sentences.append(piece)
+    return sentences
+
+
+def split_for_speech(text: str, max_chars: int = STREAM_CHUNK_CHARS):
+    """Sentences, with long ones cut at the last comma (or space) before max_chars."""
+    chunks = []
+    for sentence in _sentences(text, max_chars):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(", ", 0, max_chars)
+            cut = cut + 1 if cut > 0 else sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                break
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+def speech_units(text: str, streaming: bool = True):
+    """The pieces the speaker synthesizes and caches separately: the whole text, or its chunks when streaming."""
+    chunks = split_for_speech(text) if streaming else [text]
+    return chunks if len(chunks) > 1 else [text]
+
+
+def normalize_for_tts(text: str) -> str:
+    """Collapse whitespace so trivially different strings share one cache entry."""
+    return " ".join(text.split())
+
+
+def cache_key(text: str, fingerprint: str, synth_kwargs: dict = None) -> str:
+    """Content address of the audio: normalized text, normalizer version, model fingerprint and synthesis kwargs."""
+    payload = json.dumps({"text": text, "norm": TEXT_NORM_VERSION, "model": fingerprint,
+                          "kwargs": synth_kwargs or {}}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def to_pcm16(samples) -> np.ndarray:
+    """float waveform in [-1, 1] -> int16 PCM in one pass (no float64 / intermediate copies)."""
+    samples = np.asarray(samples, dtype=np.float32)
+    if not samples.flags.writeable:
+        samples = samples.copy()
+    np.clip(samples, -1.0, 1.0, out=samples)
+    pcm = np.empty(samples.shape[0], dtype=np.int16)
+    np.multiply(samples, 32767.0, out=pcm, casting="unsafe")
+    return pcm
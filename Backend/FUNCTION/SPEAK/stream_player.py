@@ -0,0 +1,81 @@
+# stream_player.py
+"""
+Gap-free streaming playback.
+
+One sd.OutputStream per utterance; synthesized chunks are appended with
+write() while earlier ones play, and the stream callback copies them out
+back to back. If the callback runs dry before finish() it plays silence and
+counts an underrun (synthesis fell behind playback).
+"""
+import time
+import threading
+import collections
+import numpy as np
+import sounddevice as sd
+
+
+class StreamPlayer:
+    def __init__(self, sample_rate: int, blocksize: int = 1024):
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self._chunks = collections.deque()
+        self._offset = 0
+        self._lock = threading.Lock()
+        self._finished = False
+        self._drained = threading.Event()
+        self._stream = None
+        self.first_audio_at = None     # perf_counter() when the first samples were handed to the device
+        self.underruns = 0
+
+    def write(self, samples: np.ndarray):
+        """Queue mono int16 samples; starts the stream on first write."""
+        if samples is None or not len(samples):
+            return
+        with self._lock:
+            self._chunks.append(np.asarray(samples, dtype=np.int16))
+        if self._stream is None:
+            self._stream = sd.OutputStream(samplerate=self.sample_rate, channels=1, dtype="int16",
+                                           blocksize=self.blocksize, callback=self._callback)
+            self._stream.start()
+
+    def finish(self):
+        """No more chunks; wait() returns once everything queued has played."""
+        with self._lock:
+            self._finished = True
+            if not self._chunks:
+                self._drained.set()
+
+    def wait(self, stop_event: threading.Event = None):
+        """Block until drained (or stop_event is set, which cuts playback)."""
+        while not self._drained.wait(0.02):
+            if stop_event is not None and stop_event.is_set():
+                break
+        self.close()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        filled = 0
+        with self._lock:
+            while filled < frames and self._chunks:
+                chunk = self._chunks[0]
+                n = min(frames - filled, len(chunk) - self._offset)
+                out[filled:filled + n] = chunk[self._offset:self._offset + n]
+                filled += n
+                self._offset += n
+                if self._offset == len(chunk):
+                    self._chunks.popleft()
+                    self._offset = 0
+            if filled and self.first_audio_at is None:
+                self.first_audio_at = time.perf_counter()
+            if filled < frames:
+                out[filled:] = 0
+                if self._finished:
+                    self._drained.set()
+                elif self.first_audio_at is not None:
+                    self.underruns += 1
@@ -0,0 +1,154 @@
+# tts_cache.py
+"""
+Persistent, size-bounded TTS audio cache.
+
+The synthesized tts_<key>.wav files in the outputs directory are indexed in
+SQLite (key, path, voice, model version, size, created, last access, hits).
+On startup the index is reconciled with the directory, so files from earlier
+runs are hits again and deleted files drop out. When the files exceed
+`max_bytes`, the least recently used ones are evicted.
+
+Hits only touch memory: last access times and hit counts are written to the
+index in one batch by flush_access(), which runs before eviction, on add()
+and when the speaker's disk writer thread is idle.
+"""
+import os
+import glob
+import time
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key           TEXT PRIMARY KEY,
+    path          TEXT NOT NULL,
+    voice         TEXT,
+    model_version TEXT,
+    size          INTEGER NOT NULL,
+    created       REAL NOT NULL,
+    last_access   REAL NOT NULL,
+    hits          INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+"""
+
+
+class TTSCache:
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024, index_name: str = "index.sqlite3"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, index_name), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "evicted_bytes": 0}
+        self._touched = {}   # key -> (last access, hits) not yet written to the index
+        self.rebuild()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"tts_{key}.wav")
+
+    def rebuild(self):
+        """Reconcile the index with the files on disk, then enforce the byte budget."""
+        on_disk = {}
+        for path in glob.glob(os.path.join(self.directory, "tts_*.wav")):
+            key = os.path.basename(path)[4:-4]
+            on_disk[key] = path
+        with self._lock:
+            indexed = {key for (key,) in self._db.execute("SELECT key FROM entries")}
+            gone = indexed - on_disk.keys()
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in gone])
+            rows = []
+            for key in on_disk.keys() - indexed:
+                st = os.stat(on_disk[key])
+                # voice / model version of files from before the index are unknown
+                rows.append((key, on_disk[key], None, None, st.st_size, st.st_mtime, st.st_mtime))
+            self._db.executemany("INSERT INTO entries (key, path, voice, model_version, size, created, last_access)"
+                                 " VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+        self.evict()
+        return len(rows), len(gone)
+
+    def get(self, key: str, model_version: str = None):
+        """Path of the cached WAV, or None. Entries made by another model version are dropped."""
+        with self._lock:
+            row = self._db.execute("SELECT path, model_version FROM entries WHERE key = ?", (key,)).fetchone()
+            if row and model_version and row[1] and row[1] != model_version:
+                self._stats["stale"] += 1
+                self._remove_locked(key, row[0])
+                self._db.commit()
+                row = None
+            elif row and not os.path.exists(row[0]):
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self._touched.pop(key, None)
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            hits = self._touched.get(key, (0.0, 0))[1]
+            self._touched[key] = (time.time(), hits + 1)
+            return row[0]
+
+    def flush_access(self):
+        """Write pending last access times and hit counts to the index in one transaction."""
+        with self._lock:
+            self._flush_access_locked()
+
+    def _flush_access_locked(self):
+        if not self._touched:
+            return
+        self._db.executemany("UPDATE entries SET last_access = ?, hits = hits + ? WHERE key = ?",
+                             [(at, hits, key) for key, (at, hits) in self._touched.items()])
+        self._db.commit()
+        self._touched.clear()
+
+    def add(self, key: str, path: str, voice: str = None, model_version: str = None):
+        """Index a freshly written WAV and evict older entries if over budget."""
+        now = time.time()
+        with self._lock:
+            self._flush_access_locked()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, path, voice, model_version, size, created, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, path, voice, model_version, os.path.getsize(path), now, now))
+            self._db.commit()
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used files until the cache fits in max_bytes."""
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            self._flush_access_locked()  # LRU order needs the pending access times
+            evicted = 0
+            for key, path, size in self._db.execute(
+                    "SELECT key, path, size FROM entries ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._remove_locked(key, path)
+                total -= size
+                evicted += 1
+                self._stats["evictions"] += 1
+                self._stats["evicted_bytes"] += size
+            self._db.commit()
+            return evicted
+
+    def _remove_locked(self, key: str, path: str):
+        self._touched.pop(key, None)
+        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            s = dict(self._stats)
+        lookups = s["hits"] + s["misses"]
+        return dict(s, entries=entries, bytes=size, max_bytes=self.max_bytes,
+                    hit_rate=round(s["hits"] / lookups, 3) if lookups else None)
@@ -1,77 +1,129 @@
-{
-  "open_chrome": {
-    "keywords": ["open chrome", "launch chrome", "start chrome", "open browser", "open google", "launch browser", "open the chrome browser", "open google chrome"],
-    "response": "Opening Chrome now.",
-    "action": "open_chrome"
-  },
-  "open_notepad": {
-    "keywords": ["open notepad", "launch notepad", "start notepad", "open text editor", "open notepad for me", "open the notepad app"],
-    "response": "Opening Notepad.",
-    "action": "open_notepad"
-  },
-  "open_calculator": {
-    "keywords": ["open calculator", "start calculator", "launch calculator", "open calc", "open the calculator app"],
-    "response": "Opening Calculator.",
-    "action": "open_calculator"
-  },
-  "open_explorer": {
-    "keywords": ["open explorer", "open file explorer", "open files", "show me files", "open my files", "open windows explorer"],
-    "response": "Opening File Explorer.",
-    "action": "open_explorer"
-  },
-  "play_music": {
-    "keywords": ["play music", "start music", "play songs", "play my playlist", "turn on music"],
-    "response": "Playing music now.",
-    "action": "play_music"
-  },
-  "screenshot": {
-    "keywords": ["take screenshot", "screenshot", "capture screen", "take a screenshot", "save screenshot"],
-    "response": "Taking a screenshot.",
-    "action": "screenshot"
-  },
-  "shutdown": {
-    "keywords": ["shutdown", "shut down", "power off", "turn off computer", "turn off pc"],
-    "response": "Shutting down the system.",
-    "action": "shutdown"
-  },
-  "restart": {
-    "keywords": ["restart", "reboot", "restart computer", "reboot system"],
-    "response": "Restarting now.",
-    "action": "restart"
-  },
-  "volume_up": {
-    "keywords": ["volume up", "increase volume", "turn it up", "raise volume", "make it louder"],
-    "response": "Increasing volume.",
-    "action": "volume_up"
-  },
-  "volume_down": {
-    "keywords": ["volume down", "decrease volume", "turn it down", "lower volume", "make it quieter"],
-    "response": "Decreasing volume.",
-    "action": "volume_down"
-  },
-  "mute": {
-    "keywords": ["mute", "mute system", "turn off sound", "stop sound"],
-    "response": "Toggling mute.",
-    "action": "volume_mute"
-  },
-  "open_vscode": {
-    "keywords": ["open vscode", "launch visual studio code", "open code", "start vscode"],
-    "response": "Opening Visual Studio Code.",
-    "action": "open_vscode"
-  },
-  "open_edge": {
-    "keywords": ["open edge", "launch edge", "open microsoft edge", "start edge browser"],
-    "response": "Opening Edge.",
-    "action": "open_edge"
-  },
-  "open_command_prompt": {
-    "keywords": ["open command prompt", "open cmd", "start cmd", "open terminal", "open command line"],
-    "response": "Opening Command Prompt.",
-    "action": "open_command_prompt"
-  },
-  "tell_time": {
-    "keywords": ["what time is it", "tell me the time", "current time", "time now", "what's the time"],
-    "response": "The current time is",
-    "action": "tell_time"
-  }
+# control.py
+"""
+System action handlers for the command catalog.
+
+ACTIONS maps each catalog `action` to a handler taking a BRAIN.actions.ActionContext
+and returning the text to speak (or None for the catalog response).
+"""
+import os
+import sys
+import datetime
+import subprocess
+from UTILS.path_utils import TD
+
+# Optional: pyautogui for media keys and screenshots
+try:
+    import pyautogui
+    PYAUTOGUI = True
+except Exception:
+    PYAUTOGUI = False
+
+WINDOWS = sys.platform.startswith("win")
+MAC = sys.platform == "darwin"
+
+
+def _launch(windows: str, mac: str = None, linux: str = None):
+    """Start an app detached from Jarvis."""
+    if WINDOWS:
+        subprocess.Popen(f'start "" {windows}', shell=True)
+    elif MAC:
+        subprocess.Popen(["open", "-a", mac or windows])
+    else:
+        subprocess.Popen((linux or windows).split(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _open_path(path: str):
+    if WINDOWS:
+        os.startfile(path)
+    else:
+        subprocess.Popen(["open" if MAC else "xdg-open", path])
+
+
+def _press(key: str, presses: int = 1):
+    if not PYAUTOGUI:
+        return "Sorry, media keys need pyautogui installed."
+    pyautogui.press(key, presses=presses)
+    return None
+
+
+# -----------------------------
+# Handlers
+# -----------------------------
+def open_chrome(ctx):
+    _launch("chrome", mac="Google Chrome", linux="google-chrome")
+
+
+def open_edge(ctx):
+    _launch("msedge", mac="Microsoft Edge", linux="microsoft-edge")
+
+
+def open_notepad(ctx):
+    _launch("notepad", mac="TextEdit", linux="gedit")
+
+
+def open_calculator(ctx):
+    _launch("calc", mac="Calculator", linux="gnome-calculator")
+
+
+def open_explorer(ctx):
+    _open_path(os.path.expanduser("~"))
+
+
+def open_vscode(ctx):
+    _launch("code", mac="Visual Studio Code", linux="code")
+
+
+def open_command_prompt(ctx):
+    _launch("cmd", mac="Terminal", linux="x-terminal-emulator")
+
+
+def play_music(ctx):
+    music_dir = os.path.join(os.path.expanduser("~"), "Music")
+    if not os.path.isdir(music_dir):
+        return "I couldn't find your music folder."
+    _open_path(music_dir)
+
+
+def screenshot(ctx):
+    if not PYAUTOGUI:
+        return "Sorry, screenshots need pyautogui installed."
+    path = TD(f"screenshot_{datetime.datetime.now():%Y%m%d_%H%M%S}.png")
+    pyautogui.screenshot(path)
+
+
+def volume_up(ctx):
+    return _press("volumeup", presses=5)
+
+
+def volume_down(ctx):
+    return _press("volumedown", presses=5)
+
+
+def volume_mute(ctx):
+    return _press("volumemute")
+
+
+ACTIONS = {
+    "open_chrome": open_chrome,
+    "open_edge": open_edge,
+    "open_notepad": open_notepad,
+    "open_calculator": open_calculator,
+    "open_explorer": open_explorer,
+    "open_vscode": open_vscode,
+    "open_command_prompt": open_command_prompt,
+    "play_music": play_music,
+    "screenshot": screenshot,
+    "volume_up": volume_up,
+    "volume_down": volume_down,
+    "volume_mute": volume_mute,
+    # shutdown / restart are deliberately not registered: power actions need a spoken confirmation first
 }
+
+
+def execute_system_command(action, params=None):
+    """Run one system action by name (kept for callers outside the registry)."""
+    from BRAIN.actions import ActionContext
+    handler = ACTIONS.get(action)
+    if handler is None:
+        return None
+    return handler(ActionContext(action, params or {}, ""))
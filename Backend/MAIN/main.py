@@ -1,9 +1,15 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from BRAIN.processor import execute_command, find_best_match
+from BRAIN.processor import dispatch_final, DISPATCHER, ACTIONS, SPECULATION, CATALOG
+from DATA.JARVIS_DLG_DATASET.DLG import websites
 from DATA.FIREBASE.AUTH.firebase_auth import login_user, register_user
-from FUNCTION.LISTEN.listen import listen
-from FUNCTION.SPEAK.speak import JarvisSpeaker
+from FUNCTION.LISTEN.listen import listen, VOSK_MODEL, COMMAND_GRAMMAR, VAD_GATE, WAKE_DETECTOR
+from FUNCTION.LISTEN.asr_service import ASRService, ASRBusy, ASRStreamClosed
+from FUNCTION.LISTEN.capture import get_capture
+from FUNCTION.SPEAK.speak import JarvisSpeaker, TTS_MODEL
+from UTILS.model_loader import ModelUnavailable
+from UTILS.speech_state import SPEECH_STATE, SpeechStateBroadcaster
+import os
 import threading
 import time
 
@@ -12,6 +18,20 @@ CORS(app)  # Allow requests from your React Native app
 
 # Global variables
 speaker = JarvisSpeaker()
+
+# Load the speech recognition model in the background; routes that don't need it work right away
+VOSK_MODEL.start()
+
+# Optional: publish speaking state to other local processes (JARVIS_SPEECH_STATE_PORT=50555)
+if os.environ.get("JARVIS_SPEECH_STATE_PORT"):
+    SpeechStateBroadcaster(SPEECH_STATE, int(os.environ["JARVIS_SPEECH_STATE_PORT"]))
+
+# Keep the recognizer grammar in step with the command catalog
+COMMAND_GRAMMAR.follow(CATALOG, slot_values={"website": list(websites)})
+
+# Extra audio streams (other rooms / devices) decoded on a shared worker pool
+ASR = ASRService(lambda: VOSK_MODEL.get(timeout=0))  # 503 while the model is still loading
+
 jarvis_running = False
 jarvis_logs = []  # stores messages like a chat
 
@@ -42,24 +62,108 @@ def start_jarvis():
     global jarvis_running
     if jarvis_running:
         return jsonify({"message": "Jarvis is already running"})
+    if VOSK_MODEL.state == "failed":
+        return jsonify({"message": f"Speech recognition unavailable: {VOSK_MODEL.error}"}), 503
     jarvis_running = True
     threading.Thread(target=jarvis_main_loop, daemon=True).start()
     return jsonify({"message": "Jarvis started"})
 
+@app.route("/status", methods=["GET"])
+def status():
+    """Model readiness: idle / loading / ready / failed for speech recognition and TTS"""
+    return jsonify({"running": jarvis_running, "ready": VOSK_MODEL.ready and TTS_MODEL.ready,
+                    "models": {"asr": VOSK_MODEL.status(), "tts": TTS_MODEL.status()}})
+
+@app.route("/actions", methods=["GET"])
+def action_stats():
+    """In-flight / completed / timed-out action counts and per-action handler latency"""
+    return jsonify(dict(DISPATCHER.stats(), handlers=ACTIONS.stats()))
+
+@app.route("/audio", methods=["GET"])
+def audio_stats():
+    """VAD counters (fraction of audio never sent to the recognizer), wake-word CPU / latency, TTS time-to-first-audio"""
+    return jsonify({"vad": VAD_GATE.stats(), "wake_word": WAKE_DETECTOR.stats(), "tts": speaker.stats()})
+
+@app.route("/speech-state", methods=["GET"])
+def speech_state():
+    """Whether Jarvis is speaking. ?version=N&wait=S long-polls up to S seconds for a change past N"""
+    version = request.args.get("version", type=int)
+    if version is not None:
+        wait = min(request.args.get("wait", default=25.0, type=float), 60.0)
+        return jsonify(SPEECH_STATE.wait_for_change(version, timeout=wait))
+    return jsonify(SPEECH_STATE.snapshot())
+
+@app.route("/asr", methods=["GET"])
+def asr_stats():
+    """Open streams with per-stream real-time factor, queued audio and pool load"""
+    return jsonify(ASR.stats())
+
+@app.route("/asr/streams", methods=["POST"])
+def asr_open():
+    """Open a decoding stream. {"grammar": "commands"} decodes against the command grammar"""
+    data = request.get_json(silent=True) or {}
+    grammar = COMMAND_GRAMMAR.json if data.get("grammar") == "commands" else None
+    try:
+        stream = ASR.open_stream(data.get("id"), grammar=grammar, vad=data.get("vad", True))
+    except ASRBusy as e:
+        return jsonify({"success": False, "message": str(e)}), 429
+    except ModelUnavailable as e:
+        return jsonify({"success": False, "message": str(e)}), 503
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 409
+    return jsonify({"success": True, "id": stream.id})
+
+@app.route("/asr/streams/<stream_id>/audio", methods=["POST"])
+def asr_feed(stream_id):
+    """Raw 16 kHz mono int16 PCM body. 429 means the stream is too far behind — retry later"""
+    stream = ASR.get(stream_id)
+    if stream is None:
+        return jsonify({"success": False, "message": "Unknown stream"}), 404
+    try:
+        stream.feed(request.get_data(), timeout=1.0)
+    except ASRBusy as e:
+        return jsonify({"success": False, "message": str(e)}), 429
+    except ASRStreamClosed as e:
+        return jsonify({"success": False, "message": str(e)}), 409
+    return jsonify({"success": True, "partial": stream.partial, "results": list(stream.results),
+                    "pending_seconds": round(stream.pending_seconds, 2)})
+
+@app.route("/asr/streams/<stream_id>", methods=["DELETE"])
+def asr_close(stream_id):
+    stream = ASR.get(stream_id)
+    if stream is None:
+        return jsonify({"success": False, "message": "Unknown stream"}), 404
+    text = stream.close(timeout=10)
+    return jsonify({"success": True, "text": text, "results": list(stream.results), "stats": stream.stats()})
+
 @app.route("/get-logs", methods=["GET"])
 def get_logs():
     """Return chat logs to the mobile app"""
     return jsonify({"logs": jarvis_logs})
 
+def _log_response(future):
+    response = future.result()
+    if response:
+        jarvis_logs.append({"sender": "Jarvis", "text": response})
+
 def jarvis_main_loop():
     global jarvis_running, jarvis_logs
+    try:
+        get_capture().start()  # keep the microphone open between listen() calls
+    except Exception as e:
+        print(f"[Audio Error] {e}")
     speaker.speak("Hello, Mr. Shivang. Jarvis is now online.")
     jarvis_logs.append({"sender": "Jarvis", "text": "Hello, Mr. Shivang. Jarvis is now online."})
 
     while jarvis_running:
         try:
-            query = listen()
+            query = listen(on_partial=SPECULATION.feed_partial)
             if not query:
+                SPECULATION.reset()
+                if VOSK_MODEL.state == "failed":
+                    jarvis_logs.append({"sender": "Jarvis", "text": "Speech recognition is unavailable."})
+                    jarvis_running = False
+                    break
                 continue
 
             print(f"User said: {query}")
@@ -70,13 +174,11 @@ def jarvis_main_loop():
                 speaker.speak(msg)
                 jarvis_logs.append({"sender": "Jarvis", "text": msg})
                 jarvis_running = False
+                SPECULATION.reset()
                 break
 
-            # Process command
-            command_key, command_data = find_best_match(query)
-            response = execute_command(command_key, command_data)
-            if response:
-                jarvis_logs.append({"sender": "Jarvis", "text": response})
+            # Process command off this thread so we can go straight back to listening
+            dispatch_final(query).add_done_callback(_log_response)
 
         except Exception as e:
             err = f"[ERROR] {e}"
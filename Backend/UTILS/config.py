@@ -0,0 +1,43 @@
+# FILE: UTILS/config.py
+"""
+Runtime configuration.
+
+Values come from (highest first):
+  1. environment variables  JARVIS_<KEY>, e.g. JARVIS_VOSK_MODEL_PATH
+  2. a JSON file            $JARVIS_CONFIG, else <user data dir>/config.json
+  3. the defaults below
+"""
+import os
+import json
+from UTILS.path_utils import TD
+
+DEFAULTS = {
+    "vosk_model_path": r"D:\JARVIS\DATA\Backend\LISTEN MODAL\Vosk Modal\vosk-model-small-en-us-0.15",
+    "tts_model_dir": r"D:\JARVIS\Backend\DATA\SPEAK MODAL\local_tts_modal",
+    "tts_cache_mb": 512,
+}
+
+CONFIG_PATH = os.environ.get("JARVIS_CONFIG") or TD("config.json")
+
+
+def _load_file(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable config {path}: {e}")
+        return {}
+
+
+_FILE = _load_file(CONFIG_PATH)
+
+
+def get(key: str, default=None):
+    env = os.environ.get(f"JARVIS_{key.upper()}")
+    if env is not None:
+        return env
+    if key in _FILE:
+        return _FILE[key]
+    return DEFAULTS.get(key, default)
@@ -0,0 +1,66 @@
+# FILE: UTILS/model_loader.py
+"""
+Background, non-fatal model loading.
+
+A ModelLoader starts in "idle", loads on a daemon thread after start()
+("loading"), and ends "ready" or "failed" (with the error kept for the API).
+get() waits for the load and raises ModelUnavailable instead of crashing the
+importer, so the server can come up and report readiness while models load.
+"""
+import time
+import threading
+
+
+class ModelUnavailable(RuntimeError):
+    """The model failed to load, or is still loading after the wait timeout."""
+
+
+class ModelLoader:
+    def __init__(self, name: str, load_fn, source: str = None):
+        self.name = name
+        self.source = source      # path or description, for status()
+        self._load_fn = load_fn
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.state = "idle"
+        self.error = None
+        self.load_seconds = None
+        self._model = None
+
+    def start(self):
+        """Begin loading on a background thread (no-op once started)."""
+        with self._lock:
+            if self.state != "idle":
+                return
+            self.state = "loading"
+        threading.Thread(target=self._load, name=f"load-{self.name}", daemon=True).start()
+
+    def _load(self):
+        t0 = time.perf_counter()
+        try:
+            self._model = self._load_fn()
+            self.state = "ready"
+            print(f"✅ {self.name} model ready in {time.perf_counter() - t0:.1f}s")
+        except Exception as e:
+            self.error = str(e)
+            self.state = "failed"
+            print(f"❌ {self.name} model failed to load: {e}")
+        self.load_seconds = round(time.perf_counter() - t0, 2)
+        self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def get(self, timeout: float = None):
+        """The loaded model; starts loading if nobody has yet."""
+        self.start()
+        if not self._done.wait(timeout):
+            raise ModelUnavailable(f"{self.name} model is still loading")
+        if self.state != "ready":
+            raise ModelUnavailable(f"{self.name} model failed to load: {self.error}")
+        return self._model
+
+    def status(self) -> dict:
+        return {"state": self.state, "source": self.source, "error": self.error,
+                "load_seconds": self.load_seconds}
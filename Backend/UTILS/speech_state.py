@@ -0,0 +1,125 @@
+# speech_state.py
+"""
+Speaking / listening coordination.
+
+speak.py flips SPEECH_STATE around playback; listen.py blocks on it while
+Jarvis talks and wakes as soon as playback ends (no polling). Every change
+bumps a version number so the API layer can long-poll for changes, and
+callbacks can subscribe.
+
+Other processes can follow the same state over a local socket:
+SpeechStateBroadcaster pushes each change to connected clients and
+RemoteSpeechState mirrors it into a local SpeechState they can wait on.
+"""
+import socket
+import threading
+import time
+
+DEFAULT_PORT = 50555
+
+
+class SpeechState:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._speaking = False
+        self.version = 0
+        self.changed_at = time.time()
+        self._subscribers = []
+
+    @property
+    def speaking(self) -> bool:
+        return self._speaking
+
+    def set_speaking(self, value: bool):
+        with self._cond:
+            if self._speaking == bool(value):
+                return
+            self._speaking = bool(value)
+            self.version += 1
+            self.changed_at = time.time()
+            self._cond.notify_all()
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(self._speaking)
+            except Exception as e:
+                print(f"[Speech State Error] {e}")
+
+    def wait_until_silent(self, timeout: float = None) -> bool:
+        """Block while Jarvis is speaking. False if still speaking after timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._speaking, timeout=timeout)
+
+    def wait_for_change(self, version: int, timeout: float = None) -> dict:
+        """Block until the state moves past `version` (long-poll), then return a snapshot."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout=timeout)
+        return self.snapshot()
+
+    def subscribe(self, callback):
+        """callback(speaking) on every change; returns an unsubscribe function."""
+        with self._cond:
+            self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {"speaking": self._speaking, "version": self.version, "since": self.changed_at}
+
+
+class SpeechStateBroadcaster:
+    """Serve a SpeechState to other processes: one byte (b"1"/b"0") per change."""
+
+    def __init__(self, state: SpeechState, port: int = DEFAULT_PORT, host: str = "127.0.0.1"):
+        self.state = state
+        self._clients = []
+        self._lock = threading.Lock()
+        self._server = socket.create_server((host, port))
+        threading.Thread(target=self._accept, daemon=True).start()
+        state.subscribe(self._publish)
+
+    def _accept(self):
+        while True:
+            conn, _ = self._server.accept()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._clients.append(conn)
+            self._send(conn, self.state.speaking)
+
+    def _send(self, conn, speaking: bool):
+        try:
+            conn.sendall(b"1" if speaking else b"0")
+            return True
+        except OSError:
+            with self._lock:
+                if conn in self._clients:
+                    self._clients.remove(conn)
+            conn.close()
+            return False
+
+    def _publish(self, speaking: bool):
+        with self._lock:
+            clients = list(self._clients)
+        for conn in clients:
+            self._send(conn, speaking)
+
+
+class RemoteSpeechState(SpeechState):
+    """Local mirror of a SpeechStateBroadcaster in another process."""
+
+    def __init__(self, port: int = DEFAULT_PORT, host: str = "127.0.0.1"):
+        super().__init__()
+        self._sock = socket.create_connection((host, port))
+        threading.Thread(target=self._follow, daemon=True).start()
+
+    def _follow(self):
+        while True:
+            data = self._sock.recv(64)
+            if not data:
+                self.set_speaking(False)  # speaker process went away
+                return
+            self.set_speaking(data[-1:] == b"1")
+
+
+# Process-wide state shared by speak.py, listen.py and the API layer
+SPEECH_STATE = SpeechState()